@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Telegram Synonym/Antonym Bot - asyncio Entry Point
+
+An alternative to main.py for hosts that can run a long-lived process. The
+webhook is acknowledged as soon as the update is read; the update is then
+processed by the same handlers on a pool of worker threads, while their
+Bot API calls share one keep-alive ``httpx.AsyncClient`` on the event loop
+(see modules/async_request.py). Updates from the same chat are processed
+in the order they arrived.
+
+Run with: python async_main.py
+"""
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from modules.startup import log_startup_report, startup_step
+with startup_step('import telegram'):
+    from telegram import Bot, Update
+    from telegram.ext import Dispatcher
+from config import (
+    BOT_TOKEN, TELEGRAM_API_URL, WEBHOOK_URL, WEBHOOK_PATH, ASYNC_HOST, ASYNC_PORT,
+    ASYNC_WORKERS, HTTP_POOL_SIZE
+)
+with startup_step('import httpx'):
+    from modules.async_request import AsyncHTTPXRequest
+from modules.logging_setup import setup_logging
+with startup_step('import handlers'):
+    from modules.dispatcher import create_dispatcher, process_update, readiness, setup_bot_commands
+    from modules.metrics import CONTENT_TYPE, render, stage
+    from modules.send_queue import QueuedBot
+
+# Configure logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Largest request body accepted from Telegram
+MAX_BODY_SIZE = 1024 * 1024
+
+RESPONSES = {
+    200: b'HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 2\r\n\r\nok',
+    400: b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n',
+    404: b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n',
+    413: b'HTTP/1.1 413 Payload Too Large\r\nContent-Length: 0\r\nConnection: close\r\n\r\n',
+}
+REASONS = {200: 'OK', 503: 'Service Unavailable'}
+
+
+def build_response(status: int, body: str, content_type: str) -> bytes:
+    """An HTTP/1.1 response with a generated body."""
+    data = body.encode('utf-8')
+    head = (f'HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: {content_type}\r\n'
+            f'Content-Length: {len(data)}\r\n\r\n')
+    return head.encode('latin-1') + data
+
+
+class WebhookServer:
+    """Minimal HTTP/1.1 webhook receiver that dispatches updates in the background."""
+
+    def __init__(self, bot: Bot, dispatcher: Dispatcher, workers: int = ASYNC_WORKERS) -> None:
+        self.bot = bot
+        self.dispatcher = dispatcher
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='update')
+        # Last scheduled update of each chat; the next one waits for it
+        self._chat_tails: Dict[int, asyncio.Task] = {}
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        """Serve webhook requests on one (keep-alive) connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    writer.write(RESPONSES[400])
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    writer.write(RESPONSES[400])
+                    break
+                if length > MAX_BODY_SIZE:
+                    writer.write(RESPONSES[413])
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                if method == 'POST' and path == WEBHOOK_PATH:
+                    # Acknowledge first so Telegram never waits on the handlers
+                    writer.write(RESPONSES[200])
+                    self.submit(body)
+                elif method == 'GET' and path == '/metrics':
+                    writer.write(build_response(200, render(), CONTENT_TYPE))
+                elif method == 'GET' and path == '/ready':
+                    status = readiness()
+                    writer.write(build_response(200 if status['ready'] else 503,
+                                                json.dumps(status), 'application/json'))
+                else:
+                    writer.write(RESPONSES[404])
+                await writer.drain()
+
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def submit(self, body: bytes) -> None:
+        """Schedule an update behind any earlier update of the same chat."""
+        try:
+            with stage('parse'):
+                update = Update.de_json(json.loads(body), self.bot)
+        except (ValueError, TypeError, AttributeError) as e:
+            # Invalid JSON, or JSON that isn't an update object
+            logger.error("Ignoring malformed update: %s", e)
+            return
+        if update is None:
+            return
+
+        chat_id = update.effective_chat.id if update.effective_chat else None
+        previous = self._chat_tails.get(chat_id) if chat_id is not None else None
+        task = asyncio.get_running_loop().create_task(self._process(update, previous))
+        if chat_id is not None:
+            self._chat_tails[chat_id] = task
+            task.add_done_callback(lambda done: self._release(chat_id, done))
+
+    def _release(self, chat_id: int, task: asyncio.Task) -> None:
+        if self._chat_tails.get(chat_id) is task:
+            del self._chat_tails[chat_id]
+
+    async def _process(self, update: Update, previous: Optional[asyncio.Task]) -> None:
+        if previous is not None:
+            await asyncio.wait([previous])
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self.executor, process_update, self.dispatcher, update)
+        except Exception as e:
+            logger.error("Error processing update %s: %s", update.update_id, e)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+async def serve() -> None:
+    """Start the bot and serve webhooks until cancelled."""
+    loop = asyncio.get_running_loop()
+    with startup_step('bot'):
+        request = AsyncHTTPXRequest(loop, con_pool_size=HTTP_POOL_SIZE)
+        bot = QueuedBot(BOT_TOKEN, base_url=TELEGRAM_API_URL, request=request)
+    with startup_step('dispatcher'):
+        dispatcher = create_dispatcher(bot)
+    webhook_server = WebhookServer(bot, dispatcher)
+
+    # Bot API calls block their caller, so they must not run on the loop itself
+    with startup_step('bot commands'):
+        await loop.run_in_executor(None, setup_bot_commands, bot)
+    if WEBHOOK_URL:
+        with startup_step('webhook'):
+            await loop.run_in_executor(None, bot.set_webhook, WEBHOOK_URL)
+        logger.info("Webhook set to %s", WEBHOOK_URL)
+    log_startup_report()
+
+    server = await asyncio.start_server(webhook_server.handle_connection, ASYNC_HOST, ASYNC_PORT)
+    logger.info("Listening on %s:%s%s", ASYNC_HOST, ASYNC_PORT, WEBHOOK_PATH)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await loop.run_in_executor(None, webhook_server.shutdown)
+        await loop.run_in_executor(None, bot.send_queue.stop)
+        await request.aclose()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        logger.info("Server stopped")
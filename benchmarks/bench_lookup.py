@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark WordNet expansion latency on the most polysemous lemmas
+
+Compares the original per-lemma expansion (kept here as a reference
+implementation) with modules.wordnet_utils.build_word_info, checks that
+both produce identical results and reports per-word latency.
+
+Usage:
+    python benchmarks/bench_lookup.py [--words 1000] [--repeat 1]
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import wordnet_utils  # noqa: E402
+from modules.wordnet_utils import build_word_info, get_first_definition, get_wordnet  # noqa: E402
+
+
+def legacy_word_info(word: str) -> Optional[Dict[str, Any]]:
+    """The expansion as it was before the rewrite, minus logging and caching."""
+    wordnet = get_wordnet()
+    pos_data = defaultdict(lambda: {
+        'meanings': set(),
+        'synonyms': [],
+        'antonyms': [],
+        'examples': set()
+    })
+    used_examples = set()
+
+    for syn in wordnet.synsets(word):
+        pos = syn.pos()
+        pos_data[pos]['meanings'].add(syn.definition())
+
+        example_count = 0
+        for example in syn.examples():
+            if word.lower() in example.lower() and example not in used_examples:
+                pos_data[pos]['examples'].add(example)
+                used_examples.add(example)
+                example_count += 1
+                if example_count >= 2:
+                    break
+
+        for lemma in list(syn.lemmas())[:10]:
+            if lemma.name() != word:
+                lemma_synsets = wordnet.synsets(lemma.name(), pos=pos)
+                meaning = lemma_synsets[0].definition() if lemma_synsets else None
+                if meaning:
+                    syn_info = {'word': lemma.name(), 'meaning': meaning, 'examples': []}
+                    if not any(s['word'] == lemma.name() for s in pos_data[pos]['synonyms']):
+                        pos_data[pos]['synonyms'].append(syn_info)
+
+            for ant in lemma.antonyms():
+                ant_info = {'word': ant.name(), 'meaning': ant.synset().definition(), 'examples': []}
+                if not any(a['word'] == ant.name() for a in pos_data[pos]['antonyms']):
+                    pos_data[pos]['antonyms'].append(ant_info)
+
+    result = {}
+    for pos, data in pos_data.items():
+        if data['synonyms'] or data['antonyms']:
+            result[pos] = {
+                'pos_name': wordnet_utils.get_pos_name(pos),
+                'meanings': sorted(list(data['meanings'])),
+                'synonyms': data['synonyms'][:10],
+                'antonyms': data['antonyms'],
+                'examples': sorted(list(data['examples']))[:2]
+            }
+    return result if result else None
+
+
+def most_polysemous(n: int) -> List[str]:
+    """Return the n lemmas with the most synsets."""
+    wordnet = get_wordnet()
+    counts = {word: len(wordnet.synsets(word)) for word in wordnet.all_lemma_names()}
+    return sorted(counts, key=lambda w: (-counts[w], w))[:n]
+
+
+def time_per_word(func: Callable[[str], Any], words: List[str]) -> List[float]:
+    timings = []
+    for word in words:
+        start = time.perf_counter()
+        func(word)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(name: str, timings: List[float]) -> None:
+    ms = sorted(t * 1000 for t in timings)
+    print(
+        f"{name:<24} total {sum(ms) / 1000:7.2f}s   mean {statistics.mean(ms):7.2f}ms   "
+        f"p50 {ms[len(ms) // 2]:7.2f}ms   p99 {ms[int(len(ms) * 0.99) - 1]:7.2f}ms   "
+        f"max {ms[-1]:7.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--words', type=int, default=1000, help="number of lemmas to benchmark")
+    parser.add_argument('--repeat', type=int, default=1, help="passes over the word list")
+    args = parser.parse_args()
+
+    logging.getLogger('modules.wordnet_utils').setLevel(logging.WARNING)
+
+    words = most_polysemous(args.words)
+    print(f"{len(words)} most polysemous lemmas (from '{words[0]}' down to '{words[-1]}')")
+
+    mismatches = [word for word in words if legacy_word_info(word) != build_word_info(word)]
+    print(f"Output mismatches: {len(mismatches)}" + (f" {mismatches[:10]}" if mismatches else ""))
+
+    for _ in range(args.repeat):
+        get_first_definition.cache_clear()
+        report("legacy", time_per_word(legacy_word_info, words))
+        report("build_word_info (cold)", time_per_word(build_word_info, words))
+        report("build_word_info (warm)", time_per_word(build_word_info, words))
+
+
+if __name__ == '__main__':
+    main()
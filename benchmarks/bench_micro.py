@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the lexical engine and formatters
+
+Times get_word_info (live WordNet build, cold lookup with empty caches and
+warm cached lookup), format_word_info, escape_markdown,
+formatter.format_response and the synonym/antonym flattening done when a
+word is saved, over a fixed sample of WordNet lemmas grouped by polysemy.
+Each case reports time per call, tracemalloc peak and retained memory per
+call, and the process peak RSS; results can be written as JSON so runs can
+be compared over time.
+
+Usage:
+    python benchmarks/bench_micro.py [--per-bucket 200] [--seed 1] [--repeat 3]
+        [--only get_word_info,escape_markdown] [--json results.json]
+"""
+import argparse
+import datetime
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.thesaurus_index import get_thesaurus_index  # noqa: E402
+from modules.word_record import WordInfo  # noqa: E402
+from modules.formatter import format_response  # noqa: E402
+from modules.rendering import escape_markdown, format_word_info  # noqa: E402
+from modules.wordnet_utils import (  # noqa: E402
+    build_word_info, get_first_definition, get_word_info, get_word_record, get_wordnet, word_cache
+)
+
+# Polysemy buckets: (label, min synsets, max synsets)
+BUCKETS = [('1', 1, 1), ('2-3', 2, 3), ('4-7', 4, 7), ('8-15', 8, 15), ('16+', 16, 10 ** 6)]
+
+Case = Tuple[str, str, Callable[[str], Any], Optional[Callable[[], None]]]
+
+
+def corpus(per_bucket: int, seed: int) -> Dict[str, List[str]]:
+    """A fixed sample of lemmas for each polysemy bucket."""
+    wordnet = get_wordnet()
+    grouped: Dict[str, List[str]] = {label: [] for label, _, _ in BUCKETS}
+    for word in sorted(wordnet.all_lemma_names()):
+        count = len(wordnet.synsets(word))
+        for label, low, high in BUCKETS:
+            if low <= count <= high:
+                grouped[label].append(word)
+                break
+    rng = random.Random(seed)
+    return {label: sorted(rng.sample(words, min(per_bucket, len(words))))
+            for label, words in grouped.items()}
+
+
+def formatter_input(word: str, record: Optional[WordInfo]) -> Dict[str, Any]:
+    """Adapt a word record to the dict shape formatter.format_response expects."""
+    entries = record.entries if record else ()
+    return {
+        'word': word,
+        'definitions': [{'part_of_speech': e.pos_name, 'definition': m} for e in entries for m in e.meanings],
+        'synonyms': record.synonym_words() if record else [],
+        'antonyms': record.antonym_words() if record else [],
+        'examples': [x for e in entries for x in e.examples]
+    }
+
+
+def clear_caches() -> None:
+    word_cache.clear()
+    get_first_definition.cache_clear()
+
+
+def build_cases(words: List[str]) -> List[Case]:
+    """(function, path, per-word callable, per-word setup) for every benchmark."""
+    infos = {word: get_word_info(word) for word in words}
+    records = {word: get_word_record(word) for word in words}
+    texts = {word: [text for entry in (records[word] or ()) for text in
+                    entry.meanings + entry.examples + tuple(w for w, _ in entry.synonyms)]
+             for word in words}
+    formatter_inputs = {word: formatter_input(word, records[word]) for word in words}
+
+    def escape_all(word: str) -> None:
+        for text in texts[word]:
+            escape_markdown(text)
+
+    def flatten(word: str) -> Tuple[List[str], List[str]]:
+        record = records[word]
+        return (record.synonym_words(), record.antonym_words()) if record else ([], [])
+
+    cases: List[Case] = [
+        ('get_word_info', 'build', build_word_info, get_first_definition.cache_clear),
+        ('get_word_info', 'cold', get_word_info, clear_caches),
+        ('get_word_info', 'warm', get_word_info, None),
+        ('format_word_info', 'both/en', lambda w: format_word_info(w, infos[w], 'both', 'en'), None),
+        ('format_word_info', 'synonym/ru', lambda w: format_word_info(w, infos[w], 'synonym', 'ru'), None),
+        ('escape_markdown', 'all strings', escape_all, None),
+        ('save_word flattening', 'warm', flatten, None),
+        ('formatter.format_response', 'both/en',
+         lambda w: format_response(formatter_inputs[w], 'both', 'en'), None),
+    ]
+    return cases
+
+
+def time_case(func: Callable[[str], Any], setup: Optional[Callable[[], None]], words: List[str]) -> List[float]:
+    """Per-call wall time for each word; ``setup`` runs untimed before every call."""
+    timings = []
+    if setup is None:
+        for word in words:
+            func(word)  # warm
+    for word in words:
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func(word)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def trace_case(func: Callable[[str], Any], setup: Optional[Callable[[], None]], words: List[str]) -> Tuple[int, int]:
+    """Return tracemalloc (peak, retained) bytes per call, averaged over the words."""
+    peak_total = retained_total = 0
+    # A full collection per call would dominate the run with WordNet loaded,
+    # so collect once and keep the collector from firing mid-measurement
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        for word in words:
+            if setup is not None:
+                setup()
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            result = func(word)
+            after, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - before
+            retained_total += after - before
+            del result
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    return peak_total // len(words), retained_total // len(words)
+
+
+def peak_rss_kb() -> int:
+    """Peak resident set size of this process in KiB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--per-bucket', type=int, default=200, help="lemmas per polysemy bucket")
+    parser.add_argument('--seed', type=int, default=1, help="corpus sampling seed")
+    parser.add_argument('--repeat', type=int, default=3, help="timing passes; the fastest is reported")
+    parser.add_argument('--only', help="comma-separated function names to run")
+    parser.add_argument('--no-trace', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--json', help="write the results to this file")
+    args = parser.parse_args()
+
+    logging.getLogger('modules').setLevel(logging.WARNING)
+
+    words_by_bucket = corpus(args.per_bucket, args.seed)
+    all_words = [word for words in words_by_bucket.values() for word in words]
+    print(f"Corpus: {len(all_words)} lemmas, " +
+          ", ".join(f"{label}: {len(words)}" for label, words in words_by_bucket.items()))
+    print(f"Thesaurus index: {'loaded' if get_thesaurus_index() is not None else 'not built (live WordNet)'}")
+
+    cases = build_cases(all_words)
+    if args.only:
+        wanted = set(args.only.split(','))
+        cases = [case for case in cases if case[0] in wanted]
+
+    results = []
+    print(f"{'function':<26} {'path':<12} {'bucket':>6} {'mean':>9} {'p50':>9} {'p99':>9} "
+          f"{'alloc peak':>11} {'retained':>9}")
+    for name, path, func, setup in cases:
+        for bucket, words in words_by_bucket.items():
+            timings = min((time_case(func, setup, words) for _ in range(args.repeat)), key=sum)
+            us = sorted(t * 1e6 for t in timings)
+            peak, retained = (None, None) if args.no_trace else trace_case(func, setup, words)
+            result = {
+                'function': name, 'path': path, 'bucket': bucket, 'calls': len(words),
+                'mean_us': statistics.mean(us), 'p50_us': us[len(us) // 2],
+                'p99_us': us[min(len(us) - 1, int(len(us) * 0.99))],
+                'alloc_peak_bytes': peak, 'alloc_retained_bytes': retained
+            }
+            results.append(result)
+            alloc = '' if peak is None else f"{peak:>10}B {retained:>8}B"
+            print(f"{name:<26} {path:<12} {bucket:>6} {result['mean_us']:>7.1f}us {result['p50_us']:>7.1f}us "
+                  f"{result['p99_us']:>7.1f}us {alloc}")
+
+    rss = peak_rss_kb()
+    print(f"Peak RSS: {rss / 1024:.1f} MiB")
+
+    if args.json:
+        output = {
+            'meta': {
+                'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                'git': git_revision(), 'python': platform.python_version(), 'platform': platform.platform(),
+                'index': get_thesaurus_index() is not None, 'per_bucket': args.per_bucket,
+                'seed': args.seed, 'repeat': args.repeat
+            },
+            'corpus': words_by_bucket,
+            'results': results,
+            'peak_rss_kb': rss
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
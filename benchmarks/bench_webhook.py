@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+End-to-end load benchmark of the webhook server against a local fake Telegram API
+
+Starts a stand-in for api.telegram.org (benchmarks/fake_telegram.py), runs
+the bot (Flask main.py or async_main.py) in a subprocess pointed at it, and
+replays synthetic updates - commands, callback buttons and free text - or
+captured ones into the webhook at a fixed concurrency. Each update is timed
+from the POST until the webhook answers (ack) and until the bot's first
+reply reaches the fake API (reply). Runs offline; the WordNet corpus must
+already be installed.
+
+Usage:
+    python benchmarks/bench_webhook.py [--server flask|async] [--store json|sqlite]
+        [--no-index] [--concurrency 8] [--requests 2000] [--users 1000]
+        [--mix command=5,callback=3,text=2] [--updates captured.jsonl]
+        [--api-latency 0] [--api-429-ratio 0] [--real-limits] [--json results.json]
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_telegram import FakeTelegramAPI, TOKEN  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.languages import MESSAGES  # noqa: E402
+
+WEBHOOK_PATH = '/webhook_path'
+# Replies that report a failure rather than an answer
+ERROR_REPLIES = tuple(messages['error_occurred'] for messages in MESSAGES.values()) + ('❌ Error',)
+
+WORDS = [
+    'good', 'bad', 'happy', 'sad', 'big', 'small', 'fast', 'slow', 'hot', 'cold',
+    'light', 'dark', 'strong', 'weak', 'rich', 'poor', 'old', 'new', 'high', 'low',
+    'run', 'walk', 'give', 'take', 'make', 'break', 'open', 'close', 'love', 'hate',
+    'begin', 'end', 'buy', 'sell', 'win', 'lose', 'increase', 'decrease', 'accept', 'refuse',
+    'beautiful', 'ugly', 'clean', 'dirty', 'easy', 'difficult', 'early', 'late', 'full', 'empty',
+    'quickly', 'slowly', 'well', 'badly', 'always', 'never', 'friend', 'enemy', 'victory', 'defeat',
+    'set', 'head', 'point', 'line', 'cut', 'play', 'turn', 'form', 'charge', 'check',
+    'xylophonist', 'qwertyuiop', 'zzzz'
+]
+COMMANDS = ['/synonym {}', '/antonym {}', '/both {}', '/both {}', '/save {}', '/saved', '/help']
+CALLBACKS = ['get_synonyms', 'get_antonyms', 'get_both', 'save_word', 'view_saved', 'back_to_menu']
+# Buttons after which the bot waits for a word as free text
+MODE_CALLBACKS = {'get_synonyms', 'get_antonyms', 'get_both', 'save_word'}
+
+
+class UpdateFactory:
+    """Builds synthetic updates for one chat, keeping its conversation state consistent."""
+
+    def __init__(self, chat_id: int, mix: Dict[str, float], rng: random.Random) -> None:
+        self.chat_id = chat_id
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.rng = rng
+        self.awaiting_word = False
+        self.counter = itertools.count()
+
+    def _user(self) -> Dict[str, Any]:
+        return {'id': self.chat_id, 'is_bot': False, 'first_name': 'Bench', 'language_code': 'en'}
+
+    def _message(self, text: str) -> Dict[str, Any]:
+        message = {
+            'message_id': next(self.counter), 'date': int(time.time()),
+            'chat': {'id': self.chat_id, 'type': 'private'}, 'from': self._user(), 'text': text
+        }
+        if text.startswith('/'):
+            message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}]
+        return message
+
+    def next(self) -> Tuple[str, Dict[str, Any]]:
+        """Return the kind and body of the next update."""
+        kind = 'text' if self.awaiting_word else self.rng.choices(self.kinds, self.weights)[0]
+        if kind == 'text' and not self.awaiting_word:
+            # Free text is only answered after a button asked for a word
+            kind = 'callback'
+            data = self.rng.choice(sorted(MODE_CALLBACKS))
+        else:
+            data = self.rng.choice(CALLBACKS)
+
+        if kind == 'text':
+            self.awaiting_word = False
+            return kind, {'message': self._message(self.rng.choice(WORDS))}
+        if kind == 'command':
+            return kind, {'message': self._message(self.rng.choice(COMMANDS).format(self.rng.choice(WORDS)))}
+
+        self.awaiting_word = data in MODE_CALLBACKS
+        return kind, {'callback_query': {
+            'id': f'{self.chat_id}:{next(self.counter)}', 'from': self._user(), 'chat_instance': str(self.chat_id),
+            'data': data, 'message': self._message('menu')
+        }}
+
+
+def captured_updates(path: str, workers: int) -> List[Iterator[Tuple[str, Dict[str, Any]]]]:
+    """
+    Load captured updates (one JSON update per line) and split them by chat,
+    so that each chat is replayed by a single worker in its original order.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        updates = [json.loads(line) for line in f if line.strip()]
+    shards: List[List[Tuple[str, Dict[str, Any]]]] = [[] for _ in range(workers)]
+    for update in updates:
+        update.pop('update_id', None)
+        if 'callback_query' in update:
+            kind = 'callback'
+        elif update.get('message', {}).get('text', '').startswith('/'):
+            kind = 'command'
+        else:
+            kind = 'text'
+        shards[zlib.crc32(str(update_chat_id(update)).encode()) % workers].append((kind, update))
+    return [itertools.cycle(shard) for shard in shards if shard]
+
+
+def update_chat_id(update: Dict[str, Any]) -> Optional[str]:
+    message = update.get('message') or (update.get('callback_query') or {}).get('message') or {}
+    chat = message.get('chat')
+    return str(chat['id']) if chat else None
+
+
+class Result:
+    __slots__ = ('kind', 'ack', 'reply', 'error')
+
+    def __init__(self, kind: str, ack: Optional[float], reply: Optional[float], error: Optional[str]) -> None:
+        self.kind = kind
+        self.ack = ack
+        self.reply = reply
+        self.error = error
+
+
+class LoadGenerator:
+    """Posts updates to the webhook from ``concurrency`` threads."""
+
+    def __init__(self, api: FakeTelegramAPI, port: int, timeout: float) -> None:
+        self.api = api
+        self.port = port
+        self.timeout = timeout
+        self.update_ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def post(self, conn: Optional[http.client.HTTPConnection], body: bytes
+             ) -> Tuple[http.client.HTTPConnection, int]:
+        for attempt in range(2):
+            if conn is None:
+                conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=self.timeout)
+            try:
+                conn.request('POST', WEBHOOK_PATH, body, {'Content-Type': 'application/json'})
+                response = conn.getresponse()
+                response.read()
+                if response.getheader('Connection', '').lower() == 'close' or response.version == 10:
+                    conn.close()
+                    conn = None
+                return conn, response.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = None
+                if attempt:
+                    raise
+        raise AssertionError('unreachable')
+
+    def send(self, conn: Optional[http.client.HTTPConnection], kind: str, update: Dict[str, Any]
+             ) -> Tuple[Optional[http.client.HTTPConnection], Result]:
+        update = dict(update, update_id=next(self.update_ids))
+        chat_id = update_chat_id(update)
+        body = json.dumps(update).encode('utf-8')
+        start = time.perf_counter()
+        try:
+            conn, status = self.post(conn, body)
+        except (OSError, http.client.HTTPException) as e:
+            return None, Result(kind, None, None, f'http: {type(e).__name__}')
+        ack = time.perf_counter() - start
+        if status != 200:
+            return conn, Result(kind, ack, None, f'http {status}')
+        if chat_id is None:
+            return conn, Result(kind, ack, None, None)
+
+        reply = self.api.wait_reply(chat_id, start, self.timeout)
+        self.api.forget(chat_id, start)
+        if reply is None:
+            return conn, Result(kind, ack, None, 'no reply')
+        error = 'error reply' if reply.text.startswith(ERROR_REPLIES) else None
+        return conn, Result(kind, ack, reply.time - start, error)
+
+    def run(self, sources: List[Iterator[Tuple[str, Dict[str, Any]]]], total: int) -> Tuple[List[Result], float]:
+        results: List[Result] = []
+        remaining = itertools.count()
+
+        def worker(source: Iterator[Tuple[str, Dict[str, Any]]]) -> None:
+            conn = None
+            local = []
+            while next(remaining) < total:
+                kind, update = next(source)
+                conn, result = self.send(conn, kind, update)
+                local.append(result)
+            with self.lock:
+                results.extend(local)
+
+        threads = [threading.Thread(target=worker, args=(source,)) for source in sources]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, time.perf_counter() - start
+
+
+def round_robin(factories: List[UpdateFactory]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    for factory in itertools.cycle(factories):
+        yield factory.next()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_bot(args: argparse.Namespace, api: FakeTelegramAPI, port: int, workdir: str
+              ) -> Tuple[subprocess.Popen, float]:
+    """Start the bot under test and wait until it accepts connections."""
+    os.makedirs(os.path.join(workdir, 'data'), exist_ok=True)
+    index = os.path.join(ROOT, 'data', 'thesaurus.idx')
+    if not args.no_index and os.path.exists(index):
+        os.symlink(index, os.path.join(workdir, 'data', 'thesaurus.idx'))
+
+    env = dict(
+        os.environ, BOT_TOKEN=TOKEN, TELEGRAM_API_URL=api.base_url, USER_STORE=args.store,
+        HOST='127.0.0.1', PORT=str(port), PYTHONPATH=ROOT
+    )
+    env.pop('WEBHOOK_URL', None)
+    if not args.real_limits:
+        env.update(SEND_GLOBAL_RATE='100000', SEND_CHAT_RATE='100000')
+
+    if args.server == 'flask':
+        command = [sys.executable, '-c',
+                   f"from main import app; app.run(host='127.0.0.1', port={port}, threaded=True)"]
+    else:
+        command = [sys.executable, os.path.join(ROOT, 'async_main.py')]
+    log = open(os.path.join(workdir, 'bot.log'), 'wb')
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = start + 60
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Bot exited with code {process.returncode}, see {log.name}")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process, time.perf_counter() - start
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"Bot did not start listening within 60s, see {log.name}")
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ms = sorted(v * 1000 for v in values)
+    pick = lambda q: ms[min(len(ms) - 1, int(len(ms) * q))]  # noqa: E731
+    return {'mean': statistics.mean(ms), 'p50': pick(0.5), 'p90': pick(0.9),
+            'p99': pick(0.99), 'max': ms[-1]}
+
+
+def summarize(results: List[Result], elapsed: float) -> Dict[str, Any]:
+    by_kind = defaultdict(list)
+    for result in results:
+        by_kind[result.kind].append(result)
+        by_kind['all'].append(result)
+
+    summary = {'requests': len(results), 'seconds': elapsed, 'throughput': len(results) / elapsed, 'kinds': {}}
+    for kind, items in sorted(by_kind.items()):
+        errors = defaultdict(int)
+        for item in items:
+            if item.error:
+                errors[item.error] += 1
+        summary['kinds'][kind] = {
+            'count': len(items),
+            'ack_ms': percentiles([i.ack for i in items if i.ack is not None]),
+            'reply_ms': percentiles([i.reply for i in items if i.reply is not None]),
+            'error_rate': sum(errors.values()) / len(items),
+            'errors': dict(errors)
+        }
+    return summary
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    print(f"{summary['requests']} updates in {summary['seconds']:.2f}s: {summary['throughput']:.1f} updates/s")
+    print(f"{'kind':<9} {'count':>6} {'stage':<6} {'mean':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  errors")
+    for kind, data in summary['kinds'].items():
+        for stage in ('ack', 'reply'):
+            stats = data[f'{stage}_ms']
+            if not stats:
+                continue
+            line = f"{kind if stage == 'ack' else '':<9} {data['count'] if stage == 'ack' else '':>6} {stage:<6} "
+            line += ' '.join(f"{stats[key]:6.1f}ms" for key in ('mean', 'p50', 'p90', 'p99', 'max'))
+            if stage == 'ack':
+                line += f"  {data['error_rate'] * 100:.1f}% {data['errors'] or ''}"
+            print(line)
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        if kind not in ('command', 'callback', 'text'):
+            raise argparse.ArgumentTypeError(f"unknown update kind: {kind}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--server', choices=('flask', 'async'), default='flask')
+    parser.add_argument('--store', choices=('json', 'sqlite'), default='json', help="user store backend")
+    parser.add_argument('--no-index', action='store_true', help="serve lookups from live WordNet")
+    parser.add_argument('--concurrency', type=int, default=8, help="updates in flight")
+    parser.add_argument('--requests', type=int, default=2000, help="measured updates")
+    parser.add_argument('--warmup', type=int, default=100, help="updates sent before measuring")
+    parser.add_argument('--users', type=int, default=1000, help="distinct chats")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('command=5,callback=3,text=2'),
+                        help="relative weights of update kinds")
+    parser.add_argument('--updates', help="replay captured updates (JSON Lines) instead of synthetic ones")
+    parser.add_argument('--api-latency', type=float, default=0.0, help="fake API latency in ms")
+    parser.add_argument('--api-429-ratio', type=float, default=0.0, help="share of API calls rejected with 429")
+    parser.add_argument('--real-limits', action='store_true', help="keep Telegram's send rate limits")
+    parser.add_argument('--timeout', type=float, default=30.0, help="seconds to wait for a reply")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--keep', action='store_true', help="keep the bot's working directory")
+    args = parser.parse_args()
+
+    api = FakeTelegramAPI(latency=args.api_latency / 1000, rate_limit_ratio=args.api_429_ratio).start()
+    workdir = tempfile.mkdtemp(prefix='synant-bench-')
+    port = free_port()
+    process = None
+    try:
+        process, startup = start_bot(args, api, port, workdir)
+        print(f"{args.server} server (store={args.store}, index={'off' if args.no_index else 'on'}) "
+              f"listening after {startup:.2f}s")
+
+        rng = random.Random(args.seed)
+        if args.updates:
+            sources = captured_updates(args.updates, args.concurrency)
+        else:
+            per_worker = max(1, args.users // args.concurrency)
+            sources = [
+                round_robin([UpdateFactory(100000 + w * per_worker + i, args.mix, random.Random(rng.random()))
+                             for i in range(per_worker)])
+                for w in range(args.concurrency)
+            ]
+
+        generator = LoadGenerator(api, port, args.timeout)
+        if args.warmup:
+            generator.run(sources, args.warmup)
+        calls_before = sum(api.calls.values())
+        results, elapsed = generator.run(sources, args.requests)
+
+        summary = summarize(results, elapsed)
+        summary['config'] = {key: value for key, value in vars(args).items() if key != 'mix'}
+        summary['config']['mix'] = args.mix
+        summary['startup_seconds'] = startup
+        summary['api_calls'] = dict(api.calls)
+        summary['api_calls_per_update'] = (sum(api.calls.values()) - calls_before) / len(results)
+        summary['api_rate_limited'] = api.rate_limited
+        print_summary(summary)
+        print(f"Bot API calls per update: {summary['api_calls_per_update']:.2f}  "
+              f"by method: {dict(api.calls)}")
+
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+            print(f"Results written to {args.json}")
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        api.stop()
+        if args.keep:
+            print(f"Working directory kept at {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
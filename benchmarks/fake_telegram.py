@@ -0,0 +1,163 @@
+"""
+Local stand-in for api.telegram.org
+
+Answers Bot API calls with minimal valid results and records every call
+with the chat it went to, so load tests can run offline and match replies
+to the updates that caused them. Optionally adds a fixed latency to each
+call and rejects a fraction of them with 429 ``retry_after``.
+"""
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+TOKEN = '123456:FAKE-token-for-local-benchmarks_0000'
+BOT_USER = {'id': 123456, 'is_bot': True, 'first_name': 'Synant', 'username': 'synant_bench_bot'}
+
+_MULTIPART_FIELD = re.compile(rb'name="(chat_id|caption)"\r\n\r\n([^\r]*)')
+
+
+class Reply:
+    """One recorded Bot API call."""
+
+    __slots__ = ('time', 'method', 'chat_id', 'text')
+
+    def __init__(self, time_: float, method: str, chat_id: Optional[str], text: str) -> None:
+        self.time = time_
+        self.method = method
+        self.chat_id = chat_id
+        self.text = text
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # The bot dropping its keep-alive connections on exit is expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeTelegramAPI:
+    """Threaded HTTP server implementing the Bot API methods the bot uses."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, rate_limit_ratio: float = 0.0) -> None:
+        self.latency = latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.calls: Counter = Counter()
+        self.rate_limited = 0
+        self._replies: Dict[str, List[Reply]] = defaultdict(list)
+        self._cond = threading.Condition()
+        self._message_id = 0
+
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                method = self.path.rsplit('/', 1)[-1]
+                status, result = api.handle(method, body, self.headers.get('Content-Type', ''))
+                data = json.dumps(result).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self.server = _Server((host, port), Handler)
+        self._thread = threading.Thread(target=self.server.serve_forever, name='fake-telegram', daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/bot'
+
+    def start(self) -> 'FakeTelegramAPI':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    @staticmethod
+    def _parse(body: bytes, content_type: str) -> Dict[str, Any]:
+        if 'multipart/form-data' in content_type:
+            return {name.decode(): value.decode('utf-8', 'replace') for name, value in _MULTIPART_FIELD.findall(body)}
+        try:
+            return json.loads(body) if body else {}
+        except ValueError:
+            return {}
+
+    def handle(self, method: str, body: bytes, content_type: str) -> Tuple[int, Dict[str, Any]]:
+        """Record a call and build its response."""
+        if self.latency:
+            time.sleep(self.latency)
+        if self.rate_limit_ratio and method != 'getMe' and random.random() < self.rate_limit_ratio:
+            with self._cond:
+                self.rate_limited += 1
+            return 429, {'ok': False, 'error_code': 429, 'description': 'Too Many Requests: retry after 1',
+                         'parameters': {'retry_after': 1}}
+
+        data = self._parse(body, content_type)
+        chat_id = data.get('chat_id')
+        if chat_id is None and 'callback_query_id' in data:
+            # Benchmark callback query ids are '<chat_id>:<n>'
+            chat_id = str(data['callback_query_id']).split(':', 1)[0]
+        reply = Reply(time.perf_counter(), method, str(chat_id) if chat_id is not None else None,
+                      str(data.get('text') or data.get('caption') or ''))
+        with self._cond:
+            self.calls[method] += 1
+            self._message_id += 1
+            message_id = self._message_id
+            if reply.chat_id is not None:
+                self._replies[reply.chat_id].append(reply)
+                self._cond.notify_all()
+
+        if method == 'getMe':
+            return 200, {'ok': True, 'result': BOT_USER}
+        if method in ('sendMessage', 'sendDocument', 'editMessageText', 'editMessageReplyMarkup'):
+            message = {
+                'message_id': message_id, 'date': int(time.time()),
+                'chat': {'id': int(chat_id or 0), 'type': 'private'}, 'from': BOT_USER,
+                'text': reply.text
+            }
+            if method == 'sendDocument':
+                message['document'] = {'file_id': f'file{message_id}', 'file_unique_id': f'u{message_id}'}
+            return 200, {'ok': True, 'result': message}
+        return 200, {'ok': True, 'result': True}
+
+    def wait_reply(self, chat_id: str, after: float, timeout: float,
+                   methods: Tuple[str, ...] = ('sendMessage', 'sendDocument', 'editMessageText')
+                   ) -> Optional[Reply]:
+        """Wait for the first call of ``methods`` to the chat made after ``after``."""
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while True:
+                for reply in self._replies.get(chat_id, ()):
+                    if reply.time >= after and reply.method in methods:
+                        return reply
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def forget(self, chat_id: str, before: float) -> None:
+        """Drop recorded calls to a chat made before ``before``."""
+        with self._cond:
+            replies = self._replies.get(chat_id)
+            if replies:
+                self._replies[chat_id] = [r for r in replies if r.time >= before]
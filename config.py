@@ -6,17 +6,95 @@ load_dotenv()
 
 # Bot configuration settings
 BOT_TOKEN = os.getenv('BOT_TOKEN')
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org/bot')  # e.g. a local Bot API server
 
 # Default language (WordNet is English-only, but interface can be in Russian)
 DEFAULT_LANGUAGE = "ru"  # Changed to Russian as default
 
 # Response settings
 MAX_SYNONYMS_DISPLAY = 10  # Maximum number of synonyms to show at once
-MAX_SAVED_WORDS = 50      # Maximum number of words to save in file
+RESPONSE_TIMEOUT = 5.0     # Seconds after which a slow handler is logged
+MAX_SAVED_WORDS = 5000    # Maximum number of saved words per user
+SAVED_WORDS_PAGE_SIZE = 20  # Saved words shown per page
+
+# Lookup cache limits
+WORD_CACHE_MAX_ENTRIES = 5000            # Maximum number of cached words
+WORD_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Approximate memory budget for cached results
+RESPONSE_CACHE_MAX_ENTRIES = 10000           # Rendered responses per (word, mode, language)
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Approximate memory budget for rendered responses
+
+# Long responses shown one part of speech per page, navigated with buttons
+RESULT_PAGE_THRESHOLD = 2000      # Characters a response may have before it is paginated
+RESULT_PAGES_MAX_ENTRIES = 10000  # Paginated responses kept for their buttons
+RESULT_PAGES_TTL = 24 * 60 * 60   # Seconds the buttons of a paginated response keep working
+
+# Spelling suggestions for words that aren't found
+SPELLING_MAX_DISTANCE = 2   # Largest edit distance of a suggestion (fixed when the index is built)
+SPELLING_PREFIX_LENGTH = 7  # Characters of each lemma indexed (fixed when the index is built)
+SPELLING_SUGGESTIONS = 3    # Suggestions offered
+
+# Indirect antonyms through similar adjectives and related forms (see modules/antonym_graph.py)
+ANTONYM_GRAPH_MAX_EDGES = 10  # Antonyms kept per lemma and part of speech (fixed when the graph is built)
+
+# Inline mode autocomplete (see modules/autocomplete.py)
+INLINE_RESULTS = 10              # Lemmas offered per query
+INLINE_SYNONYMS = 5              # Synonyms shown with each lemma
+INLINE_CACHE_MAX_ENTRIES = 20000  # Answered (prefix, language) pairs kept in memory
+INLINE_CACHE_TIME = 3600         # Seconds Telegram may reuse an answer; lemma data only changes on deploy
+
+# Batch lookups of several words or an uploaded word list (see modules/batch.py)
+BATCH_MAX_WORDS = 500              # Words looked up per batch; the rest are ignored
+BATCH_WORKERS = 4                  # Lookups resolved concurrently, shared by all batches
+BATCH_SUMMARY_MAX_WORDS = 30       # Larger batches are answered with a file instead of a message
+BATCH_SUMMARY_WORDS = 4            # Synonyms and antonyms shown per word in the summary
+BATCH_MAX_FILE_BYTES = 256 * 1024  # Largest word list upload accepted
+
+# Cache warm-up at startup (see modules/warmup.py)
+WARMUP_WORDS = int(os.getenv('WARMUP_WORDS', '500'))  # Most popular words to precompute; 0 disables
+WARMUP_LOG_MAX_BYTES = 16 * 1024 * 1024  # Tail of the log file scanned for past lookups
+WARMUP_PAUSE = 0.002  # Seconds between warmed words, leaving the interpreter to request threads
 
 # Data storage
+USER_STORE_BACKEND = os.getenv('USER_STORE', 'json')  # 'json' or 'sqlite'
 USER_DATA_PATH = "data/user_data.json"
+USER_DB_PATH = "data/synant.db"  # SQLite database for the 'sqlite' backend
+PREFERENCE_CACHE_MAX_ENTRIES = 10000  # Users whose settings are kept in memory
+PREFERENCE_CACHE_CHECK_INTERVAL = 1.0  # Seconds between checks for changes by other workers
+HISTORY_JOURNAL_PATH = "data/history.jsonl"  # Write-behind journal of lookup history
+HISTORY_FLUSH_SIZE = 50         # Buffered entries that trigger an early journal flush
+HISTORY_FLUSH_INTERVAL = 1.0    # Seconds between journal flushes
+HISTORY_COMPACT_INTERVAL = 60.0  # Seconds between folding the journal into the user store
+SAVED_WORDS_DB_PATH = "data/saved_words.db"  # Saved word collections (see modules/saved_words.py)
 SAVE_PATHS_FILE = "data/save_paths.json"  # File to store user save paths
+THESAURUS_INDEX_PATH = "data/thesaurus.idx"  # Precompiled WordNet lookups (see modules/thesaurus_index.py)
+WORDNET_SNAPSHOT_PATH = "data/wordnet.snapshot"  # Prebuilt WordNet lemma index (see modules/wordnet_snapshot.py)
+MORPHOLOGY_TABLE_PATH = "data/morphology.json"  # Irregular form -> lemma table (see modules/morphology.py)
+SPELLING_INDEX_PATH = "data/spelling.idx"  # Symmetric-delete index for spelling suggestions (see modules/spelling.py)
+ANTONYM_GRAPH_PATH = "data/antonyms.idx"  # Direct and indirect antonyms (see modules/antonym_graph.py)
+
+# Asyncio webhook server (async_main.py)
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')  # Public URL Telegram should post updates to
+WEBHOOK_PATH = "/webhook_path"
+ASYNC_HOST = os.getenv('HOST', '0.0.0.0')
+ASYNC_PORT = int(os.getenv('PORT', '8080'))
+ASYNC_WORKERS = 32        # Updates processed concurrently
+HTTP_POOL_SIZE = 64       # Keep-alive connections to the Bot API
+
+# Outbound Bot API calls (see modules/send_queue.py)
+SEND_WORKERS = 8          # Chats sent to in parallel
+SEND_GLOBAL_RATE = float(os.getenv('SEND_GLOBAL_RATE', '30'))  # Messages per second across all chats
+SEND_GLOBAL_BURST = SEND_GLOBAL_RATE
+SEND_CHAT_RATE = float(os.getenv('SEND_CHAT_RATE', '1'))  # Messages per second in one chat
+SEND_CHAT_BURST = 3       # Messages sent back to back before the chat rate applies
+SEND_MAX_RETRIES = 3      # Retries of a call rejected with retry_after
+
+# Logging (see modules/logging_setup.py)
+LOG_FILE = os.getenv('LOG_FILE', 'logs/bot.log')  # Empty to log to stderr only
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+# Per-logger levels; LOG_LEVELS="modules.wordnet_utils=DEBUG,httpx=INFO" adds or overrides entries
+LOG_LEVELS = {'httpx': 'WARNING'}  # One line per Bot API call otherwise
+LOG_LEVELS.update(item.strip().split('=', 1) for item in os.getenv('LOG_LEVELS', '').split(',') if '=' in item)
+LOG_DEBUG_SAMPLE_EVERY = int(os.getenv('LOG_DEBUG_SAMPLE_EVERY', '100'))  # Keep 1 in N of each debug message
 
 # Keyboard callback data
 CALLBACK_DATA = {
@@ -26,6 +104,9 @@ CALLBACK_DATA = {
     'SAVE_WORD': 'save_word',
     'VIEW_SAVED': 'view_saved',
     'DOWNLOAD_SAVED': 'download_saved',  # New callback for downloading saved words
+    'SAVED_PAGE': 'saved_page',  # Followed by ':<page>:<collection>'
+    'LOOKUP': 'lookup',  # Followed by ':<mode>:<word>'
+    'RESULT_PAGE': 'result_page',  # Followed by ':<token>:<page>'
     'SWITCH_LANG': 'switch_language',
     'BACK': 'back_to_menu'
 }
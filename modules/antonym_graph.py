@@ -0,0 +1,313 @@
+"""
+Precomputed antonym graph for the Telegram Synonym/Antonym Bot
+
+WordNet only records antonyms between a few head words, so most adjective
+satellites ("soggy", "damp") and many derived nouns have none of their
+own. Their antonyms are indirect: "soggy" is similar to the head adjective
+"wet", whose antonym is "dry"; "dryness" is derived from "dry", whose
+antonym "wet" has the derived form "wetness". Walking those relations per
+request means several synset lookups for every sense of a word, so the
+graph is built offline and stored as a compressed sparse row (CSR) file:
+each (lemma, part of speech) row lists its antonyms with the lemma the
+relation went through and the kind of relation (``direct``, ``similar``
+or ``derived``). The file is memory-mapped and only the row lemmas are
+read into a dict at load, so a query is a dict lookup and a slice.
+
+File layout (little-endian unsigned 32-bit integers unless noted):
+
+    header         magic, version, string count, row count, edge count
+    string offsets (string count + 1) cumulative offsets into the string data
+    row lemmas     string id of each row's lemma
+    row starts     (row count + 1) indexes into the edge arrays
+    edge targets   string id of the antonym
+    edge vias      string id of the lemma the relation goes through
+    edge pos       one ASCII part-of-speech tag per edge (bytes)
+    edge kinds     index into ``PROVENANCE`` per edge (bytes)
+    string data    UTF-8 lemma names
+
+Build the graph with:
+
+    python -m modules.antonym_graph [output_path]
+"""
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import ANTONYM_GRAPH_PATH, ANTONYM_GRAPH_MAX_EDGES
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'SYNANT01'
+VERSION = 1
+
+_HEADER = struct.Struct('<8s4I')
+
+# Kinds of relation, strongest first
+PROVENANCE = ('direct', 'similar', 'derived')
+DIRECT, SIMILAR, DERIVED = range(len(PROVENANCE))
+
+# (antonym, lemma the relation goes through, provenance)
+AntonymEdge = Tuple[str, str, str]
+
+
+class AntonymGraph:
+    """Read-only, memory-mapped view of a built antonym graph."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        magic, version, n_strings, n_rows, n_edges = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or sys.byteorder != 'little':
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} antonym graph")
+
+        self.edge_count = n_edges
+        # Views straight into the mapped file; the arrays are never copied
+        view = memoryview(self._mm)
+        offset = _HEADER.size
+        sections = []
+        for count in (n_strings + 1, n_rows, n_rows + 1, n_edges, n_edges):
+            sections.append(view[offset:offset + 4 * count].cast('I'))
+            offset += 4 * count
+        for _ in range(2):
+            sections.append(view[offset:offset + n_edges])
+            offset += n_edges
+        (self._string_offsets, row_lemmas, self._row_starts, self._targets,
+         self._vias, self._pos, self._kinds) = sections
+        self._string_data = offset
+        # The only structure built at load: lemma -> row, for O(1) lookups
+        self._rows: Dict[str, int] = {self._string(sid): row for row, sid in enumerate(row_lemmas)}
+        row_lemmas.release()
+
+    def close(self) -> None:
+        for name in ('_string_offsets', '_row_starts', '_targets', '_vias', '_pos', '_kinds'):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        self._mm.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, lemma: object) -> bool:
+        return lemma in self._rows
+
+    def _string(self, sid: int) -> str:
+        start = self._string_data + self._string_offsets[sid]
+        end = self._string_data + self._string_offsets[sid + 1]
+        return sys.intern(self._mm[start:end].decode('utf-8'))
+
+    def antonyms(self, lemma: str, pos: Optional[str] = None,
+                 indirect_only: bool = False) -> List[AntonymEdge]:
+        """
+        Antonyms of a lemma, strongest relation and most common sense first.
+
+        Args:
+            lemma: Lowercased lemma name (``_`` for spaces)
+            pos: Only antonyms of this part-of-speech tag (None for all)
+            indirect_only: Leave out the antonyms WordNet records directly
+
+        Returns:
+            (antonym, lemma the relation goes through, provenance) tuples
+        """
+        row = self._rows.get(lemma)
+        if row is None:
+            return []
+        tag = ord(pos) if pos is not None else None
+        edges = []
+        for i in range(self._row_starts[row], self._row_starts[row + 1]):
+            if tag is not None and self._pos[i] != tag:
+                continue
+            kind = self._kinds[i]
+            if indirect_only and kind == DIRECT:
+                continue
+            edges.append((self._string(self._targets[i]), self._string(self._vias[i]), PROVENANCE[kind]))
+        return edges
+
+
+def _same_pos(a: str, b: str) -> bool:
+    """Whether two synset POS tags are the same part of speech (satellites are adjectives)."""
+    return a == b or {a, b} <= {'a', 's'}
+
+
+def build_graph(path: str = ANTONYM_GRAPH_PATH, max_edges: int = ANTONYM_GRAPH_MAX_EDGES) -> int:
+    """
+    Build the antonym graph for every WordNet lemma.
+
+    Args:
+        path: Output file path
+        max_edges: Most antonyms kept per lemma and part of speech
+
+    Returns:
+        Number of edges written
+    """
+    from .wordnet_utils import get_wordnet
+
+    start_time = time.time()
+    wordnet = get_wordnet()
+
+    # (lemma, pos) -> {antonym: (via, kind, sense)}, keeping the strongest
+    # kind and, within it, the most common sense it was found through
+    rows: Dict[Tuple[str, str], Dict[str, Tuple[str, int, int]]] = {}
+
+    def add(source: str, pos: str, sense: int, target: str, via: str, kind: int) -> None:
+        if target.lower() == source:
+            return
+        edges = rows.setdefault((source, pos), {})
+        if target not in edges or edges[target][1:] > (kind, sense):
+            edges[target] = (via, kind, sense)
+
+    # WordNet lists a lemma's senses most common first
+    sense_orders: Dict[Tuple[str, str], Dict[Any, int]] = {}
+
+    def sense_order(lemma: Any, pos: str) -> Dict[Any, int]:
+        key = (lemma.name(), 'a' if pos == 's' else pos)
+        order = sense_orders.get(key)
+        if order is None:
+            order = {synset: i for i, synset in enumerate(wordnet.synsets(*key))}
+            sense_orders[key] = order
+        return order
+
+    for synset in wordnet.all_synsets():
+        pos = synset.pos()
+        heads = synset.similar_tos() if pos == 's' else []
+        for lemma in synset.lemmas():
+            source = lemma.name().lower()
+            sense = sense_order(lemma, pos).get(synset, 0)
+            for antonym in lemma.antonyms():
+                add(source, pos, sense, antonym.name(), antonym.name(), DIRECT)
+            # A satellite is opposite to the antonyms of its head adjectives
+            for head in heads:
+                for head_lemma in head.lemmas():
+                    for antonym in head_lemma.antonyms():
+                        add(source, pos, sense, antonym.name(), head_lemma.name(), SIMILAR)
+            # A derived form is opposite to the same kind of form of its root's antonyms
+            for related in lemma.derivationally_related_forms():
+                for antonym in related.antonyms():
+                    for form in antonym.derivationally_related_forms():
+                        if _same_pos(form.synset().pos(), pos):
+                            add(source, pos, sense, form.name(), related.name(), DERIVED)
+
+    # Number of senses of each antonym; among antonyms of the same sense,
+    # the more polysemous (more common) word ranks first
+    sense_counts: Dict[str, int] = {}
+
+    def sense_count(word: str) -> int:
+        count = sense_counts.get(word)
+        if count is None:
+            count = sense_counts[word] = len(wordnet.synsets(word))
+        return count
+
+    strings: Dict[str, int] = {}
+
+    def string_id(text: str) -> int:
+        return strings.setdefault(text, len(strings))
+
+    row_lemmas = array('I')
+    row_starts = array('I', [0])
+    targets = array('I')
+    vias = array('I')
+    edge_pos = bytearray()
+    kinds = bytearray()
+    # Rows of a lemma are kept together so one dict entry covers them all
+    by_lemma: Dict[str, List[Tuple[str, Dict[str, Tuple[str, int, int]]]]] = {}
+    for (source, pos), edges in rows.items():
+        by_lemma.setdefault(source, []).append((pos, edges))
+    for source in sorted(by_lemma):
+        row_lemmas.append(string_id(source))
+        for pos, edges in sorted(by_lemma[source]):
+            # The most relevant antonyms survive the cap: strongest relation,
+            # then the source's most common sense, then the most common antonym
+            ranked = sorted(edges.items(), key=lambda item: (
+                item[1][1], item[1][2], -sense_count(item[0]), item[0]
+            ))[:max_edges]
+            for target, (via, kind, _) in ranked:
+                targets.append(string_id(target))
+                vias.append(string_id(via))
+                edge_pos += pos.encode('ascii')
+                kinds.append(kind)
+        row_starts.append(len(targets))
+
+    string_offsets = array('I', [0])
+    string_data = bytearray()
+    for text in strings:
+        string_data += text.encode('utf-8')
+        string_offsets.append(len(string_data))
+
+    arrays = [string_offsets, row_lemmas, row_starts, targets, vias]
+    if sys.byteorder == 'big':
+        for values in arrays:
+            values.byteswap()
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(strings), len(row_lemmas), len(targets)))
+        for values in arrays:
+            f.write(values.tobytes())
+        f.write(bytes(edge_pos))
+        f.write(bytes(kinds))
+        f.write(bytes(string_data))
+    os.replace(tmp_path, path)
+
+    counts = {name: kinds.count(kind) for kind, name in enumerate(PROVENANCE)}
+    logger.info("Antonym graph written to %s (%d lemmas, %d edges: %s; %d bytes, %.0fs)",
+                path, len(row_lemmas), len(targets), counts, os.path.getsize(path), time.time() - start_time)
+    return len(targets)
+
+
+_graph: Optional[AntonymGraph] = None
+_graph_checked = False
+_graph_lock = threading.Lock()
+
+
+def get_antonym_graph() -> Optional[AntonymGraph]:
+    """Return the shared antonym graph, or None if it hasn't been built."""
+    global _graph, _graph_checked
+    if not _graph_checked:
+        with _graph_lock:
+            if not _graph_checked:
+                if os.path.exists(ANTONYM_GRAPH_PATH):
+                    try:
+                        _graph = AntonymGraph(ANTONYM_GRAPH_PATH)
+                        logger.info("Antonym graph loaded (%d lemmas, %d edges)", len(_graph), _graph.edge_count)
+                    except (OSError, ValueError) as e:
+                        logger.error("Error loading antonym graph: %s", e)
+                else:
+                    logger.info("Antonym graph not found, indirect antonyms are off")
+                _graph_checked = True
+    return _graph
+
+
+def indirect_antonyms(lemma: str, pos: str) -> List[AntonymEdge]:
+    """Antonyms of a lemma's part of speech that WordNet doesn't record directly (empty without the graph)."""
+    graph = get_antonym_graph()
+    if graph is None:
+        return []
+    return graph.antonyms(lemma.lower(), pos, indirect_only=True)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+    parser = argparse.ArgumentParser(description="Build the antonym graph")
+    parser.add_argument('path', nargs='?', default=ANTONYM_GRAPH_PATH)
+    args = parser.parse_args()
+    build_graph(args.path)
@@ -0,0 +1,125 @@
+"""
+Telegram Bot API requests over a shared asyncio HTTP client
+
+python-telegram-bot 13 calls the Bot API synchronously. ``AsyncHTTPXRequest``
+keeps that interface for the handlers but hands every call to one
+``httpx.AsyncClient`` running on the server's event loop, so all worker
+threads share a single pool of keep-alive connections and the loop
+multiplexes their round trips.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from telegram.error import (
+    BadRequest, ChatMigrated, Conflict, InvalidToken, NetworkError, RetryAfter,
+    TelegramError, TimedOut, Unauthorized
+)
+from telegram.utils.request import Request, USER_AGENT
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncHTTPXRequest(Request):
+    """A PTB ``Request`` whose HTTP round trips run on an asyncio event loop."""
+
+    __slots__ = ('_loop', '_client', '_read_timeout')
+
+    def __init__(
+            self,
+            loop: asyncio.AbstractEventLoop,
+            con_pool_size: int = 64,
+            connect_timeout: float = 5.0,
+            read_timeout: float = 5.0
+    ) -> None:
+        super().__init__(con_pool_size=1, connect_timeout=connect_timeout, read_timeout=read_timeout)
+        self._con_pool_size = con_pool_size
+        self._loop = loop
+        self._read_timeout = read_timeout
+        self._client = httpx.AsyncClient(
+            headers={'user-agent': USER_AGENT},
+            limits=httpx.Limits(
+                max_connections=con_pool_size,
+                max_keepalive_connections=con_pool_size
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+        )
+
+    def _timeout(self, timeout: Any) -> httpx.Timeout:
+        """Convert PTB's urllib3 timeout to an httpx timeout."""
+        read = getattr(timeout, 'read_timeout', None) if timeout is not None else None
+        return httpx.Timeout(read or self._read_timeout, connect=self._connect_timeout)
+
+    @staticmethod
+    def _split_fields(fields: Dict[str, Any]) -> Tuple[Dict[str, str], Dict[str, Tuple]]:
+        """Split urllib3 multipart fields into form values and files."""
+        data, files = {}, {}
+        for name, value in fields.items():
+            if isinstance(value, tuple):
+                files[name] = value
+            else:
+                data[name] = value
+        return data, files
+
+    def _request_wrapper(self, method: str, url: str, body: Optional[bytes] = None,
+                         headers: Optional[Dict[str, str]] = None,
+                         fields: Optional[Dict[str, Any]] = None,
+                         timeout: Any = None, **kwargs: Any) -> bytes:
+        """Run the request on the event loop and wait for the response body."""
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            raise RuntimeError("Bot API calls block; make them from a worker thread, not the event loop")
+
+        if fields is not None:
+            data, files = self._split_fields(fields)
+            request_kwargs = {'data': data, 'files': files or None}
+        else:
+            request_kwargs = {'content': body}
+        request = self._client.request(
+            method, url, headers=headers, timeout=self._timeout(timeout), **request_kwargs
+        )
+        future = asyncio.run_coroutine_threadsafe(request, self._loop)
+        try:
+            resp = future.result()
+        except httpx.TimeoutException as error:
+            raise TimedOut() from error
+        except httpx.HTTPError as error:
+            raise NetworkError(f'httpx HTTPError {error}') from error
+
+        if 200 <= resp.status_code <= 299:
+            return resp.content
+
+        try:
+            message = str(self._parse(resp.content))
+        except (ChatMigrated, RetryAfter):
+            raise
+        except (ValueError, TelegramError):
+            message = 'Unknown HTTPError'
+
+        if resp.status_code in (401, 403):
+            raise Unauthorized(message)
+        if resp.status_code == 400:
+            raise BadRequest(message)
+        if resp.status_code == 404:
+            raise InvalidToken()
+        if resp.status_code == 409:
+            raise Conflict(message)
+        if resp.status_code == 413:
+            raise NetworkError('File too large. Check telegram api limits '
+                               'https://core.telegram.org/bots/api#senddocument')
+        if resp.status_code == 502:
+            raise NetworkError('Bad Gateway')
+        raise NetworkError(f'{message} ({resp.status_code})')
+
+    async def aclose(self) -> None:
+        """Close the pooled connections; call from the event loop."""
+        await self._client.aclose()
+
+    def stop(self) -> None:
+        super().stop()
+        if not self._loop.is_closed() and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.aclose(), self._loop)
@@ -0,0 +1,112 @@
+"""
+Inline mode autocomplete for the Telegram Synonym/Antonym Bot
+
+Typing ``@bot hap`` in any chat sends an inline query for every keystroke,
+so answering one has to be cheap. The spelling index already stores every
+WordNet lemma in sorted order with its number of senses; the lemmas
+starting with the typed prefix are a contiguous range of it, found by
+binary search over the memory-mapped data. The most frequent lemmas of the
+range are offered with their top synonyms, and the answer for each
+(prefix, language) pair is kept in an LRU cache, since users typing the
+same word ask for the same prefixes.
+"""
+import heapq
+import logging
+from typing import List, Tuple
+
+from telegram import InlineQueryResultArticle, InputTextMessageContent, ParseMode
+
+from config import INLINE_RESULTS, INLINE_SYNONYMS, INLINE_CACHE_MAX_ENTRIES
+from .cache import LRUCache
+from .languages import get_message
+from .metrics import register_cache
+from .rendering import escape_lexical, escape_markdown
+from .spelling import get_spelling_index
+from .wordnet_utils import get_word_record
+
+logger = logging.getLogger(__name__)
+
+# (prefix, lang) -> answer
+inline_cache = LRUCache(INLINE_CACHE_MAX_ENTRIES)
+register_cache('inline', inline_cache.stats)
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase the query and spell spaces as WordNet's ``_``."""
+    return '_'.join(text.lower().split())
+
+
+def complete(prefix: str, limit: int = INLINE_RESULTS) -> List[str]:
+    """
+    Lemmas starting with ``prefix``.
+
+    Returns:
+        Up to ``limit`` lemmas: the prefix itself if it is a lemma, then
+        the rest by number of senses, shorter and alphabetically first on ties
+    """
+    index = get_spelling_index()
+    if index is None or not prefix:
+        return []
+    ids = index.prefix_range(prefix)
+    if not ids:
+        return []
+    # The prefix sorts before every longer lemma starting with it
+    exact = index.lemma(ids[0]) == prefix
+    rest = ids[1:] if exact else ids
+    frequency = index.frequency
+    # Ids follow alphabetical order, so ties keep the alphabetically first lemmas
+    top = heapq.nsmallest(limit - exact, rest, key=lambda i: (-frequency(i), i))
+    ranked = sorted(((frequency(i), index.lemma(i)) for i in top),
+                    key=lambda pair: (-pair[0], len(pair[1]), pair[1]))
+    return ([prefix] if exact else []) + [lemma for _, lemma in ranked]
+
+
+def top_synonyms(lemma: str, limit: int = INLINE_SYNONYMS) -> List[str]:
+    """The first distinct synonyms of a lemma, across its parts of speech."""
+    record = get_word_record(lemma)
+    if record is None:
+        return []
+    synonyms: List[str] = []
+    for entry in record.entries:
+        for word, _ in entry.synonyms:
+            word = word.replace('_', ' ')
+            if word != lemma.replace('_', ' ') and word not in synonyms:
+                synonyms.append(word)
+                if len(synonyms) == limit:
+                    return synonyms
+    return synonyms
+
+
+def inline_results(text: str, lang: str) -> Tuple[InlineQueryResultArticle, ...]:
+    """
+    The inline query answer for what the user typed after the bot's name.
+
+    Each result shows a lemma with its top synonyms and, when chosen, posts
+    them as a message.
+    """
+    prefix = normalize_query(text)
+    if not prefix:
+        return ()
+    key = (prefix, lang)
+    cached = inline_cache.get(key)
+    if cached is not None:
+        return cached
+
+    results = []
+    for lemma in complete(prefix):
+        word = lemma.replace('_', ' ')
+        synonyms = top_synonyms(lemma)
+        description = ', '.join(synonyms) if synonyms else get_message('inline_no_synonyms', lang)
+        results.append(InlineQueryResultArticle(
+            id=lemma[:64],
+            title=word,
+            description=description,
+            input_message_content=InputTextMessageContent(
+                f"*{escape_lexical(word)}*: {escape_markdown(description)}",
+                parse_mode=ParseMode.MARKDOWN
+            )
+        ))
+    results = tuple(results)
+    inline_cache.set(key, results)
+    logger.debug("Inline query %r: %d results", prefix, len(results))
+    return results
@@ -0,0 +1,129 @@
+"""
+Batch lookups for the Telegram Synonym/Antonym Bot
+
+Users paste vocabulary lists, either as several words in one message or as
+a ``.txt`` upload. The words are normalised to their lemmas and
+deduplicated; lemmas already in the lookup cache are read directly and the
+rest are resolved on a small shared thread pool, so one large list can't
+occupy every update worker and several batches don't start a thread per
+word. The results go back as a one-line-per-word summary, or as a text
+file when the list is too long for a message.
+"""
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from config import BATCH_MAX_WORDS, BATCH_WORKERS, BATCH_SUMMARY_WORDS
+from .languages import get_message
+from .morphology import canonical_form
+from .rendering import escape_lexical, escape_markdown
+from .wordnet_utils import get_word_record, word_cache
+from .word_record import WordInfo
+
+logger = logging.getLogger(__name__)
+
+# (word as typed, lemma it was looked up as, record or None if not found)
+BatchEntry = Tuple[str, str, Optional[WordInfo]]
+
+# Entries of a list are separated by newlines, commas or semicolons; a
+# list without them is split on whitespace
+_SEPARATORS = re.compile(r'[\n\r,;\t]+')
+
+_executor = ThreadPoolExecutor(BATCH_WORKERS, thread_name_prefix='batch')
+
+
+def parse_words(text: str, limit: int = BATCH_MAX_WORDS) -> Tuple[List[str], bool]:
+    """
+    Split a word list into distinct, lowercased entries.
+
+    Entries may be multi-word expressions (``ice cream``) when the list
+    uses separators other than spaces; they are looked up as WordNet's
+    ``ice_cream``.
+
+    Returns:
+        Up to ``limit`` entries in their original order, and whether
+        entries beyond the limit were dropped
+    """
+    parts = _SEPARATORS.split(text)
+    if len(parts) == 1:
+        parts = text.split()
+    words = []
+    for part in parts:
+        word = '_'.join(part.lower().split()).strip('.!?"\'()[]')
+        if word:
+            words.append(word)
+    words = list(dict.fromkeys(words))
+    return words[:limit], len(words) > limit
+
+
+def resolve(words: List[str]) -> List[BatchEntry]:
+    """
+    Look up a list of words, resolving the uncached lemmas concurrently.
+
+    Returns:
+        One entry per word, in the order given
+    """
+    lemmas = {word: canonical_form(word) for word in words}
+    records: Dict[str, Optional[WordInfo]] = {}
+    pending = {}
+    for lemma in dict.fromkeys(lemmas.values()):
+        if word_cache.version(lemma) is not None:
+            records[lemma] = get_word_record(lemma)
+        else:
+            pending[lemma] = _executor.submit(get_word_record, lemma)
+    logger.debug("Batch of %d words: %d cached, %d to look up",
+                 len(words), len(records), len(pending))
+    for lemma, future in pending.items():
+        records[lemma] = future.result()
+    return [(word, lemma, records[lemma]) for word, lemma in lemmas.items()]
+
+
+def _display(word: str, lemma: str) -> str:
+    word = word.replace('_', ' ')
+    return word if word == lemma.replace('_', ' ') else f"{word} ({lemma.replace('_', ' ')})"
+
+
+def _related(record: WordInfo, mode: str, limit: Optional[int]) -> Tuple[List[str], List[str]]:
+    synonyms = record.synonym_words() if mode in ('synonym', 'both') else []
+    antonyms = record.antonym_words() if mode in ('antonym', 'both') else []
+    return ([w.replace('_', ' ') for w in synonyms[:limit]],
+            [w.replace('_', ' ') for w in antonyms[:limit]])
+
+
+def format_summary(entries: List[BatchEntry], mode: str, lang: str, truncated: bool = False,
+                   limit: int = BATCH_SUMMARY_WORDS) -> str:
+    """A Markdown message with one line per word found and a list of the words that weren't."""
+    found = [entry for entry in entries if entry[2] is not None]
+    lines = [get_message('batch_header', lang).format(len(found), len(entries)), '']
+    for word, lemma, record in found:
+        synonyms, antonyms = _related(record, mode, limit)
+        parts = [', '.join(map(escape_lexical, synonyms))] if synonyms else []
+        if antonyms:
+            parts.append('≠ ' + ', '.join(map(escape_lexical, antonyms)))
+        lines.append(f"• *{escape_markdown(_display(word, lemma))}*: {' | '.join(parts) or '—'}")
+    missing = [word.replace('_', ' ') for word, _, record in entries if record is None]
+    if missing:
+        lines.extend(['', get_message('batch_not_found', lang).format(escape_markdown(', '.join(missing)))])
+    if truncated:
+        lines.extend(['', get_message('batch_truncated', lang).format(BATCH_MAX_WORDS)])
+    return '\n'.join(lines)
+
+
+def format_file(entries: List[BatchEntry], mode: str, lang: str) -> bytes:
+    """The full results as a plain text file, one block per word."""
+    blocks = []
+    for word, lemma, record in entries:
+        if record is None:
+            continue
+        synonyms, antonyms = _related(record, mode, None)
+        lines = [_display(word, lemma)]
+        if synonyms:
+            lines.append(f"  {get_message('batch_file_synonyms', lang)}: {', '.join(synonyms)}")
+        if antonyms:
+            lines.append(f"  {get_message('batch_file_antonyms', lang)}: {', '.join(antonyms)}")
+        blocks.append('\n'.join(lines))
+    missing = [word.replace('_', ' ') for word, _, record in entries if record is None]
+    if missing:
+        blocks.append(get_message('batch_not_found', lang).format(', '.join(missing)))
+    return ('\n\n'.join(blocks) + '\n').encode('utf-8')
@@ -2,36 +2,45 @@
 Telegram bot command handlers
 """
 from telegram import Update, ParseMode
+from telegram.error import BadRequest, TelegramError
 from telegram.ext import CallbackContext, ConversationHandler
-from .wordnet_utils import get_word_info, format_word_info
+from .wordnet_utils import get_word_info, get_word_record
+from .rendering import (
+    escape_markdown, get_word_response, store_result_pages, format_surface_form, with_surface_form,
+    result_pages, MAX_MESSAGE_LENGTH
+)
 from .languages import get_message
-from .keyboards import get_main_keyboard, get_back_keyboard
+from .keyboards import (
+    get_main_keyboard, get_back_keyboard, get_saved_words_keyboard, get_suggestions_keyboard,
+    get_result_page_keyboard
+)
+from .user_store import get_preference_cache
+from .history_journal import get_history_journal
+from .saved_words import get_saved_word_store
+from .metrics import stage
+from .autocomplete import inline_results
+from .morphology import canonical_form
+from .batch import parse_words, resolve, format_summary, format_file
+from utils.helpers import timed_function
+import io
 import json
 import os
+import re
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
-from config import DEFAULT_LANGUAGE, CALLBACK_DATA, SAVE_PATHS_FILE, MAX_SAVED_WORDS
+from telegram import InlineKeyboardMarkup
+from config import (
+    DEFAULT_LANGUAGE, CALLBACK_DATA, SAVE_PATHS_FILE, MAX_SAVED_WORDS, SAVED_WORDS_PAGE_SIZE,
+    INLINE_CACHE_TIME, BATCH_SUMMARY_MAX_WORDS, BATCH_MAX_FILE_BYTES, RESULT_PAGE_THRESHOLD
+)
 
 # States for conversation handler
 AWAITING_WORD = 1
+AWAITING_SAVE_PATH = 2
 
 logger = logging.getLogger(__name__)
 
-# Load user data
-def load_user_data() -> Dict[str, Any]:
-    try:
-        with open('data/user_data.json', 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
-
-# Save user data
-def save_user_data(data: Dict[str, Any]) -> None:
-    os.makedirs('data', exist_ok=True)
-    with open('data/user_data.json', 'w') as f:
-        json.dump(data, f, indent=2)
-
 def load_save_paths() -> Dict[str, str]:
     """Load save paths for all users."""
     try:
@@ -49,16 +58,12 @@ def save_save_paths(paths: Dict[str, str]) -> None:
 
 def get_user_language(user_id: int) -> str:
     """Get user's preferred language."""
-    user_data = load_user_data()
-    return user_data.get(str(user_id), {}).get('language', DEFAULT_LANGUAGE)
+    return get_preference_cache().get(user_id).get('language') or DEFAULT_LANGUAGE
 
 def set_user_language(user_id: int, language: str) -> None:
     """Set user's preferred language."""
-    user_data = load_user_data()
-    if str(user_id) not in user_data:
-        user_data[str(user_id)] = {}
-    user_data[str(user_id)]['language'] = language
-    save_user_data(user_data)
+    with stage('persist'):
+        get_preference_cache().set_language(user_id, language)
 
 def get_user_save_path(user_id: int) -> str:
     """Get user's save file path."""
@@ -71,6 +76,7 @@ def set_user_save_path(user_id: int, save_path: str) -> None:
     paths[str(user_id)] = save_path
     save_save_paths(paths)
 
+@timed_function
 def start_command(update: Update, context: CallbackContext) -> None:
     """Send a welcome message when the command /start is issued."""
     user = update.effective_user
@@ -95,6 +101,7 @@ def start_command(update: Update, context: CallbackContext) -> None:
         parse_mode=ParseMode.MARKDOWN
     )
 
+@timed_function
 def help_command(update: Update, context: CallbackContext) -> None:
     """Send a message when the command /help is issued."""
     user_id = update.effective_user.id
@@ -106,12 +113,65 @@ def help_command(update: Update, context: CallbackContext) -> None:
         parse_mode=ParseMode.MARKDOWN
     )
 
+def send_response_chunk(message: Any, chunk: str, keyboard: InlineKeyboardMarkup, lang: str) -> bool:
+    """
+    Send one message of a response.
+
+    Returns:
+        False if delivery failed for good and the rest shouldn't be sent
+    """
+    try:
+        message.reply_text(chunk, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
+        return True
+    except BadRequest as e:
+        logger.error("Error sending response: %s", e)
+        # Try sending without markdown if there might be a markdown formatting issue
+        try:
+            message.reply_text(
+                "Sorry, there was an error formatting the response. Here it is without formatting:\n\n" + 
+                chunk.replace('*', '').replace('_', '').replace('`', ''),
+                reply_markup=keyboard
+            )
+            return True
+        except BadRequest as e2:
+            logger.error("Error sending plain text response: %s", e2)
+            # Last resort - send a simple error message
+            try:
+                message.reply_text(
+                    get_message('error_occurred', lang),
+                    reply_markup=get_main_keyboard(lang)
+                )
+            except Exception as e3:
+                logger.error("Failed to send error message: %s", e3)
+            return False
+        except TelegramError as e2:
+            logger.error("Error sending plain text response: %s", e2)
+            return False
+    except TelegramError as e:
+        # Delivery failed even after the send queue's retries; more sends won't help
+        logger.error("Error sending response, dropping the rest: %s", e)
+        return False
+
+def build_result_page(token: str, page: int, lang: str) -> Optional[Tuple[str, InlineKeyboardMarkup]]:
+    """Build the text and navigation keyboard for one page of a long response, or None if it expired."""
+    stored = result_pages.get(token)
+    if stored is None:
+        return None
+    pages, header = stored
+    page = min(max(page, 0), len(pages) - 1)
+    
+    text = pages[page].strip('\n')
+    if page == 0 and header:
+        text = f"{header}\n\n{text}"
+    text += "\n\n" + get_message('page_of', lang).format(page + 1, len(pages))
+    return text, get_result_page_keyboard(lang, token, page, len(pages))
+
 def process_word_command(update: Update, context: CallbackContext, mode: str) -> None:
     """Process word-related commands (synonym, antonym, both)."""
     user_id = update.effective_user.id
     lang = get_user_language(user_id)
     
-    logger.info(f"Processing word command with mode: {mode}")
+    logger.debug("Processing word command with mode: %s", mode)
     
     if not context.args:
         try:
@@ -121,100 +181,111 @@ def process_word_command(update: Update, context: CallbackContext, mode: str) ->
                 parse_mode=ParseMode.MARKDOWN
             )
         except Exception as e:
-            logger.error(f"Error sending prompt message: {str(e)}")
+            logger.error("Error sending prompt message: %s", e)
         return
 
-    word = context.args[0].lower()
-    logger.info(f"Looking up word: {word}")
+    if len(context.args) > 1:
+        process_batch(update.message, user_id, lang, mode, ' '.join(context.args))
+        return
+
+    surface = context.args[0].lower()
     
     try:
-        info = get_word_info(word)
-        logger.info(f"Got word info for '{word}': {'Found' if info else 'Not found'}")
+        # Inflected forms are looked up and cached under their lemma
+        with stage('lookup'):
+            word = canonical_form(surface)
+        logger.info("Looking up word: %s", word)
+        response = get_word_response(word, mode, lang)
+        record = response.record
+        logger.debug("Got response for '%s': %s", word, 'Found' if record else 'Not found')
         
-        response = format_word_info(word, info, mode, lang)
-        logger.info(f"Formatted response for '{word}' (length: {len(response)})")
-        
-        # Split response if it's too long
-        MAX_MESSAGE_LENGTH = 4096
-        if len(response) > MAX_MESSAGE_LENGTH:
-            logger.info(f"Response too long ({len(response)} chars), splitting into multiple messages")
-            chunks = [response[i:i + MAX_MESSAGE_LENGTH] for i in range(0, len(response), MAX_MESSAGE_LENGTH)]
-            for chunk in chunks:
-                try:
-                    update.message.reply_text(
-                        chunk,
-                        reply_markup=get_main_keyboard(lang),
-                        parse_mode=ParseMode.MARKDOWN
-                    )
-                except Exception as e:
-                    logger.error(f"Error sending response chunk: {str(e)}")
+        # Long responses are shown one part of speech at a time in a single
+        # message, kept on the server for its navigation buttons
+        if record is not None and response.is_long(RESULT_PAGE_THRESHOLD):
+            header = format_surface_form(surface, word, lang) if word != surface else None
+            text, keyboard = build_result_page(store_result_pages(response.pages(), header), 0, lang)
+            send_response_chunk(update.message, text, keyboard, lang)
         else:
-            try:
-                update.message.reply_text(
-                    response,
-                    reply_markup=get_main_keyboard(lang),
-                    parse_mode=ParseMode.MARKDOWN
-                )
-                logger.info(f"Successfully sent response for '{word}'")
-            except Exception as e:
-                logger.error(f"Error sending response: {str(e)}")
-                # Try sending without markdown if there might be a markdown formatting issue
-                try:
-                    update.message.reply_text(
-                        "Sorry, there was an error formatting the response. Here it is without formatting:\n\n" + 
-                        response.replace('*', '').replace('_', '').replace('`', ''),
-                        reply_markup=get_main_keyboard(lang)
-                    )
-                except Exception as e2:
-                    logger.error(f"Error sending plain text response: {str(e2)}")
-                    # Last resort - send a simple error message
-                    try:
-                        update.message.reply_text(
-                            get_message('error_occurred', lang),
-                            reply_markup=get_main_keyboard(lang)
-                        )
-                    except Exception as e3:
-                        logger.error(f"Failed to send error message: {str(e3)}")
+            chunks = response.messages()
+            if record is not None and word != surface:
+                chunks = with_surface_form(chunks, surface, word, lang)
+            # A word that wasn't found gets a button for each spelling suggestion
+            if record is None:
+                keyboard = get_suggestions_keyboard(lang, mode, response.suggestions)
+            else:
+                keyboard = get_main_keyboard(lang)
+            # Messages are rendered one at a time, so the first goes out
+            # before the rest is formatted
+            for chunk in chunks:
+                if not send_response_chunk(update.message, chunk, keyboard, lang):
+                    break
         
         # Save to user history
-        if info is not None:
+        if record is not None:
             try:
-                user_data = load_user_data()
-                user_id_str = str(user_id)
-                
-                if user_id_str not in user_data:
-                    user_data[user_id_str] = {'history': [], 'language': lang}
-                elif 'history' not in user_data[user_id_str]:
-                    user_data[user_id_str]['history'] = []
-                    
-                if word not in [item['word'] for item in user_data[user_id_str]['history']]:
-                    user_data[user_id_str]['history'].append({
-                        'word': word,
-                        'info': info
-                    })
-                    user_data[user_id_str]['history'] = user_data[user_id_str]['history'][-10:]
-                    save_user_data(user_data)
+                with stage('persist'):
+                    get_history_journal().append(user_id, word, lang)
             except Exception as e:
-                logger.error(f"Error saving to user history: {str(e)}")
+                logger.error("Error saving to user history: %s", e)
     
     except Exception as e:
-        logger.error(f"Error processing word '{word}': {str(e)}")
+        logger.error("Error processing word '%s': %s", surface, e)
         try:
             update.message.reply_text(
                 get_message('error_occurred', lang),
                 reply_markup=get_main_keyboard(lang)
             )
         except Exception as e2:
-            logger.error(f"Failed to send error message: {str(e2)}")
+            logger.error("Failed to send error message: %s", e2)
+
+def process_batch(message: Any, user_id: int, lang: str, mode: str, text: str) -> None:
+    """Look up every word of a list and reply with a summary, or a file if it is too long."""
+    words, truncated = parse_words(text)
+    logger.info("Batch lookup of %d words", len(words))
+    try:
+        with stage('lookup'):
+            entries = resolve(words)
+        found = sum(1 for entry in entries if entry[2] is not None)
+        with stage('format'):
+            summary = None
+            if len(entries) <= BATCH_SUMMARY_MAX_WORDS:
+                summary = format_summary(entries, mode, lang, truncated)
+                if len(summary) > MAX_MESSAGE_LENGTH:
+                    summary = None
+            document = format_file(entries, mode, lang) if summary is None else None
+
+        if summary is not None:
+            message.reply_text(summary, reply_markup=get_main_keyboard(lang), parse_mode=ParseMode.MARKDOWN)
+        else:
+            message.reply_document(
+                document=io.BytesIO(document),
+                filename=f'{mode}s.txt',
+                caption=get_message('batch_file_ready', lang).format(found, len(entries)),
+                reply_markup=get_main_keyboard(lang)
+            )
 
+        with stage('persist'):
+            journal = get_history_journal()
+            for lemma in dict.fromkeys(lemma for _, lemma, record in entries if record is not None):
+                journal.append(user_id, lemma, lang)
+    except Exception as e:
+        logger.error("Error processing batch of %d words: %s", len(words), e)
+        try:
+            message.reply_text(get_message('error_occurred', lang), reply_markup=get_main_keyboard(lang))
+        except Exception as e2:
+            logger.error("Failed to send error message: %s", e2)
+
+@timed_function
 def synonym_command(update: Update, context: CallbackContext) -> None:
     """Handle the /synonym command."""
     process_word_command(update, context, 'synonym')
 
+@timed_function
 def antonym_command(update: Update, context: CallbackContext) -> None:
     """Handle the /antonym command."""
     process_word_command(update, context, 'antonym')
 
+@timed_function
 def both_command(update: Update, context: CallbackContext) -> None:
     """Handle the /both command."""
     process_word_command(update, context, 'both')
@@ -223,9 +294,9 @@ def saved_command(update: Update, context: CallbackContext) -> None:
     """Show user's saved words."""
     user_id = update.effective_user.id
     lang = get_user_language(user_id)
-    user_data = load_user_data()
+    history = get_history_journal().get_history(user_id)
     
-    if str(user_id) not in user_data or not user_data[str(user_id)]['history']:
+    if not history:
         update.message.reply_text(
             get_message('saved_words_empty', lang),
             reply_markup=get_main_keyboard(lang),
@@ -234,10 +305,12 @@ def saved_command(update: Update, context: CallbackContext) -> None:
         return
     
     response = [get_message('saved_words_title', lang)]
-    for item in user_data[str(user_id)]['history']:
+    for item in history:
         word = item['word']
-        syn_count = len(item['info']['synonyms'])
-        ant_count = len(item['info']['antonyms'])
+        # History keeps only the word; the details come from the lookup layer
+        record = get_word_record(word)
+        syn_count = len(record.synonym_words()) if record else 0
+        ant_count = len(record.antonym_words()) if record else 0
         response.append(get_message('word_stats', lang).format(word, syn_count, ant_count))
     
     update.message.reply_text(
@@ -246,13 +319,35 @@ def saved_command(update: Update, context: CallbackContext) -> None:
         parse_mode=ParseMode.MARKDOWN
     )
 
+@timed_function
 def button_handler(update: Update, context: CallbackContext) -> int:
     """Handle button presses."""
     query = update.callback_query
     user_id = query.from_user.id
     lang = get_user_language(user_id)
     
-    logger.info(f"Button pressed with data: {query.data}")
+    logger.info("Button pressed with data: %s", query.data)
+    
+    # Result pages acknowledge the press themselves, with a notice if they expired
+    if query.data.startswith(CALLBACK_DATA['RESULT_PAGE'] + ':'):
+        _, token, page = (query.data.split(':', 2) + [''])[:3]
+        # Stale or forged page numbers are treated like an expired result
+        result = build_result_page(token, int(page), lang) if page.isdigit() else None
+        if result is None:
+            query.answer(get_message('result_expired', lang), show_alert=True)
+            query.edit_message_reply_markup(reply_markup=get_main_keyboard(lang))
+        else:
+            query.answer()
+            text, keyboard = result
+            query.edit_message_text(text, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
+        return ConversationHandler.END
+    
+    if query.data.startswith(CALLBACK_DATA['SAVED_PAGE'] + ':'):
+        _, page, collection = (query.data.split(':', 2) + [''])[:3]
+        if not page.isdigit():
+            query.answer(get_message('result_expired', lang), show_alert=True)
+            return ConversationHandler.END
+    
     query.answer()  # Acknowledge the button press
     
     if query.data == CALLBACK_DATA['SWITCH_LANG']:
@@ -279,48 +374,16 @@ def button_handler(update: Update, context: CallbackContext) -> int:
         show_saved_command(update, context)
     elif query.data == CALLBACK_DATA['DOWNLOAD_SAVED']:
         # For download, we need to send a new message instead of editing
-        temp_file = f'data/temp/saved_words_{user_id}.json'
-        
-        try:
-            if not os.path.exists(temp_file):
-                query.message.reply_text(
-                    get_message('saved_words_empty', lang),
-                    reply_markup=get_main_keyboard(lang),
-                    parse_mode=ParseMode.MARKDOWN
-                )
-                return ConversationHandler.END
-                
-            with open(temp_file, 'r', encoding='utf-8') as f:
-                try:
-                    saved_words = json.load(f)
-                    if not isinstance(saved_words, list):
-                        saved_words = []
-                except json.JSONDecodeError:
-                    saved_words = []
-                
-            if not saved_words:
-                query.message.reply_text(
-                    get_message('saved_words_empty', lang),
-                    reply_markup=get_main_keyboard(lang),
-                    parse_mode=ParseMode.MARKDOWN
-                )
-                return ConversationHandler.END
-                
-            # Send the file as a new message
-            with open(temp_file, 'rb') as f:
-                query.message.reply_document(
-                    document=f,
-                    filename=f'saved_words.json',
-                    caption=get_message('download_ready', lang)
-                )
-                
-        except Exception as e:
-            logger.error(f"Error downloading saved words: {e}")
-            query.message.reply_text(
-                f"❌ Error downloading your saved words. Please try again later.\nError details: {str(e)}",
-                reply_markup=get_main_keyboard(lang),
-                parse_mode=ParseMode.MARKDOWN
-            )
+        send_saved_words_file(query.message, user_id, lang)
+    elif query.data.startswith(CALLBACK_DATA['SAVED_PAGE'] + ':'):
+        text, keyboard = build_saved_words_page(user_id, lang, int(page), collection or None)
+        query.edit_message_text(text, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
+    elif query.data.startswith(CALLBACK_DATA['LOOKUP'] + ':'):
+        # A spelling suggestion; answer in a new message like a command would
+        _, mode, word = query.data.split(':', 2)
+        context.args = [word]
+        update.message = query.message
+        process_word_command(update, context, mode)
     elif query.data == CALLBACK_DATA['SYNONYMS']:
         context.user_data['mode'] = 'synonym'
         query.edit_message_text(
@@ -354,16 +417,20 @@ def button_handler(update: Update, context: CallbackContext) -> int:
     
     return ConversationHandler.END
 
+@timed_function
 def text_handler(update: Update, context: CallbackContext) -> int:
     """Handle regular text messages."""
     text = update.message.text.strip()
     user_id = update.effective_user.id
     lang = get_user_language(user_id)
     
-    logger.info(f"Received text: {text}")
+    logger.info("Received text: %s", text)
     
-    # Handle word input
-    if len(text.split()) > 1:
+    # Get the current mode, defaulting to 'both' if not set
+    mode = context.user_data.get('mode', 'both')
+
+    # Several words are looked up as a batch, but only one can be saved at a time
+    if mode == 'save' and len(text.split()) > 1:
         update.message.reply_text(
             get_message('one_word_only', lang),
             reply_markup=get_main_keyboard(lang),
@@ -371,12 +438,9 @@ def text_handler(update: Update, context: CallbackContext) -> int:
         )
         return ConversationHandler.END
     
-    # Set the word as an argument for the command handlers
-    context.args = [text.lower()]  # Ensure word is lowercase
-    
-    # Get the current mode, defaulting to 'both' if not set
-    mode = context.user_data.get('mode', 'both')
-    logger.info(f"Processing word '{text}' with mode: {mode}")
+    # Set the words as arguments for the command handlers
+    context.args = text.lower().split()
+    logger.info("Processing word '%s' with mode: %s", text, mode)
     
     # Process the word based on the current mode
     if mode == 'save':
@@ -390,8 +454,13 @@ def text_handler(update: Update, context: CallbackContext) -> int:
     
     return ConversationHandler.END
 
+def normalize_collection(name: str) -> str:
+    """Reduce a collection name to a short, callback-safe identifier."""
+    return re.sub(r'[^a-z0-9_-]', '', name.lower())[:32]
+
+@timed_function
 def save_word_command(update: Update, context: CallbackContext) -> None:
-    """Save a word to the temporary file."""
+    """Save a word to the user's saved words, optionally into a named collection."""
     user_id = update.effective_user.id
     lang = get_user_language(user_id)
     
@@ -404,9 +473,11 @@ def save_word_command(update: Update, context: CallbackContext) -> None:
         return
 
     word = context.args[0].lower()
-    info = get_word_info(word)
+    collection = normalize_collection(context.args[1]) if len(context.args) > 1 else ''
+    with stage('lookup'):
+        record = get_word_record(word)
     
-    if info is None:
+    if record is None:
         update.message.reply_text(
             get_message('word_not_found', lang),
             reply_markup=get_main_keyboard(lang),
@@ -415,26 +486,10 @@ def save_word_command(update: Update, context: CallbackContext) -> None:
         return
     
     try:
-        # Create data directory if it doesn't exist
-        os.makedirs('data/temp', exist_ok=True)
-        
-        # Create a temporary file for this user
-        temp_file = f'data/temp/saved_words_{user_id}.json'
-        
-        # Read existing words or create new list
-        try:
-            if os.path.exists(temp_file):
-                with open(temp_file, 'r', encoding='utf-8') as f:
-                    saved_words = json.load(f)
-                    if not isinstance(saved_words, list):
-                        saved_words = []
-            else:
-                saved_words = []
-        except json.JSONDecodeError:
-            saved_words = []
+        store = get_saved_word_store()
             
         # Check if word already exists
-        if any(item.get('word') == word for item in saved_words):
+        if store.contains(user_id, word, collection):
             update.message.reply_text(
                 get_message('word_exists', lang).format(word),
                 reply_markup=get_main_keyboard(lang),
@@ -443,7 +498,7 @@ def save_word_command(update: Update, context: CallbackContext) -> None:
             return
             
         # Check if maximum limit reached
-        if len(saved_words) >= MAX_SAVED_WORDS:
+        if store.count(user_id) >= MAX_SAVED_WORDS:
             update.message.reply_text(
                 get_message('max_words_reached', lang).format(MAX_SAVED_WORDS),
                 reply_markup=get_main_keyboard(lang),
@@ -451,45 +506,22 @@ def save_word_command(update: Update, context: CallbackContext) -> None:
             )
             return
             
-        # Extract synonyms and antonyms from all parts of speech
-        all_synonyms = []
-        all_antonyms = []
-        
-        # Iterate through each part of speech
-        for pos_data in info.values():
-            # Add synonyms
-            for syn in pos_data.get('synonyms', []):
-                if isinstance(syn, dict) and 'word' in syn:
-                    all_synonyms.append(syn['word'])
-                elif isinstance(syn, str):
-                    all_synonyms.append(syn)
-            
-            # Add antonyms
-            for ant in pos_data.get('antonyms', []):
-                if isinstance(ant, dict) and 'word' in ant:
-                    all_antonyms.append(ant['word'])
-                elif isinstance(ant, str):
-                    all_antonyms.append(ant)
-        
-        # Add the new word with unique synonyms and antonyms
-        saved_words.append({
-            'word': word,
-            'synonyms': list(dict.fromkeys(all_synonyms)),
-            'antonyms': list(dict.fromkeys(all_antonyms))
-        })
-        
-        # Save the updated list
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            json.dump(saved_words, f, indent=2, ensure_ascii=False)
+        # Add the new word with unique synonyms and antonyms from all parts of speech
+        with stage('persist'):
+            store.add(user_id, word, record.synonym_words(), record.antonym_words(), collection)
         
+        if collection:
+            message = get_message('word_saved_to', lang).format(word, collection)
+        else:
+            message = get_message('word_saved', lang).format(word)
         update.message.reply_text(
-            get_message('word_saved', lang).format(word),
+            message,
             reply_markup=get_main_keyboard(lang),
             parse_mode=ParseMode.MARKDOWN
         )
             
     except Exception as e:
-        logger.error(f"Error saving word: {e}")
+        logger.error("Error saving word: %s", e)
         error_msg = (
             "❌ Error saving the word. Please try again later.\n"
             f"Error details: {str(e)}"
@@ -500,61 +532,53 @@ def save_word_command(update: Update, context: CallbackContext) -> None:
             parse_mode=ParseMode.MARKDOWN
         )
 
+def build_saved_words_page(user_id: int, lang: str, page: int,
+                           collection: Optional[str] = None) -> Tuple[str, InlineKeyboardMarkup]:
+    """Build the text and navigation keyboard for one page of saved words."""
+    store = get_saved_word_store()
+    total = store.count(user_id, collection)
+    if not total:
+        return get_message('saved_words_empty', lang), get_main_keyboard(lang)
+    
+    pages = (total + SAVED_WORDS_PAGE_SIZE - 1) // SAVED_WORDS_PAGE_SIZE
+    page = min(max(page, 0), pages - 1)
+    
+    response = [get_message('saved_words_title', lang)]
+    if collection:
+        response.append(get_message('collection_title', lang).format(escape_markdown(collection)))
+    response.append("")
+    for item in store.page(user_id, page, SAVED_WORDS_PAGE_SIZE, collection):
+        response.append(get_message('word_stats', lang).format(
+            escape_markdown(item['word']), len(item['synonyms']), len(item['antonyms'])
+        ))
+    if pages > 1:
+        response.append("\n" + get_message('page_of', lang).format(page + 1, pages))
+    
+    return '\n'.join(response), get_saved_words_keyboard(lang, page, pages, collection or '')
+
+@timed_function
 def show_saved_command(update: Update, context: CallbackContext) -> None:
-    """Show user's saved words and offer to download them."""
+    """Show a page of the user's saved words: /saved [collection] [page]."""
     user_id = update.effective_user.id
     lang = get_user_language(user_id)
-    temp_file = f'data/temp/saved_words_{user_id}.json'
+    
+    page = 0
+    collection = None
+    for arg in context.args or []:
+        if arg.isdigit():
+            page = int(arg) - 1
+        else:
+            collection = normalize_collection(arg)
     
     try:
-        if not os.path.exists(temp_file):
-            update.message.reply_text(
-                get_message('saved_words_empty', lang),
-                reply_markup=get_main_keyboard(lang),
-                parse_mode=ParseMode.MARKDOWN
-            )
-            return
-            
-        with open(temp_file, 'r', encoding='utf-8') as f:
-            try:
-                saved_words = json.load(f)
-                if not isinstance(saved_words, list):
-                    saved_words = []
-            except json.JSONDecodeError:
-                saved_words = []
-            
-        if not saved_words:
-            update.message.reply_text(
-                get_message('saved_words_empty', lang),
-                reply_markup=get_main_keyboard(lang),
-                parse_mode=ParseMode.MARKDOWN
-            )
-            return
-            
-        # First send the list as a message
-        response = ["📚 *Your saved words:*\n"]
-        for item in saved_words:
-            word = item['word']
-            syn_count = len(item.get('synonyms', []))
-            ant_count = len(item.get('antonyms', []))
-            response.append(f"• *{word}* - {syn_count} synonyms, {ant_count} antonyms")
-        
+        text, keyboard = build_saved_words_page(user_id, lang, page, collection)
         update.message.reply_text(
-            '\n'.join(response),
-            reply_markup=get_main_keyboard(lang),
+            text,
+            reply_markup=keyboard,
             parse_mode=ParseMode.MARKDOWN
         )
-        
-        # Then send the file
-        with open(temp_file, 'rb') as f:
-            update.message.reply_document(
-                document=f,
-                filename=f'saved_words.json',
-                caption="📥 Here's your saved words file. You can save it anywhere on your computer!"
-            )
-            
     except Exception as e:
-        logger.error(f"Error reading saved words: {e}")
+        logger.error("Error reading saved words: %s", e)
         error_msg = (
             "❌ Error reading your saved words. Please try again later.\n"
             f"Error details: {str(e)}"
@@ -563,4 +587,73 @@ def show_saved_command(update: Update, context: CallbackContext) -> None:
             error_msg,
             reply_markup=get_main_keyboard(lang),
             parse_mode=ParseMode.MARKDOWN
-        )
\ No newline at end of file
+        )
+
+def send_saved_words_file(message: Any, user_id: int, lang: str,
+                          collection: Optional[str] = None) -> None:
+    """Send the user's saved words as a JSON document."""
+    try:
+        store = get_saved_word_store()
+        if not store.count(user_id, collection):
+            message.reply_text(
+                get_message('saved_words_empty', lang),
+                reply_markup=get_main_keyboard(lang),
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
+        
+        message.reply_document(
+            document=io.BytesIO(store.export(user_id, collection)),
+            filename='saved_words.json',
+            caption=get_message('download_ready', lang)
+        )
+    except Exception as e:
+        logger.error("Error downloading saved words: %s", e)
+        message.reply_text(
+            f"❌ Error downloading your saved words. Please try again later.\nError details: {str(e)}",
+            reply_markup=get_main_keyboard(lang),
+            parse_mode=ParseMode.MARKDOWN
+        )
+
+@timed_function
+def download_saved_command(update: Update, context: CallbackContext) -> None:
+    """Send the saved words file: /download [collection]."""
+    user_id = update.effective_user.id
+    lang = get_user_language(user_id)
+    collection = normalize_collection(context.args[0]) if context.args else None
+    send_saved_words_file(update.message, user_id, lang, collection)
+
+@timed_function
+def inline_query_handler(update: Update, context: CallbackContext) -> None:
+    """Answer ``@bot <prefix>`` with matching words and their top synonyms."""
+    query = update.inline_query
+    lang = get_user_language(query.from_user.id)
+    with stage('format'):
+        results = inline_results(query.query, lang)
+    query.answer(list(results), cache_time=INLINE_CACHE_TIME)
+
+@timed_function
+def word_list_handler(update: Update, context: CallbackContext) -> None:
+    """Look up every word of an uploaded .txt word list."""
+    user_id = update.effective_user.id
+    lang = get_user_language(user_id)
+    document = update.message.document
+    if document.file_size and document.file_size > BATCH_MAX_FILE_BYTES:
+        update.message.reply_text(
+            get_message('batch_file_too_large', lang).format(BATCH_MAX_FILE_BYTES // 1024),
+            reply_markup=get_main_keyboard(lang)
+        )
+        return
+
+    try:
+        data = document.get_file().download_as_bytearray()
+    except TelegramError as e:
+        logger.error("Error downloading word list: %s", e)
+        update.message.reply_text(get_message('error_occurred', lang), reply_markup=get_main_keyboard(lang))
+        return
+
+    # A list sent after choosing synonyms or antonyms is looked up in that mode
+    mode = context.user_data.pop('mode', None)
+    if mode not in ('synonym', 'antonym', 'both'):
+        mode = 'both'
+    process_batch(update.message, user_id, lang, mode, bytes(data).decode('utf-8-sig', 'replace'))
@@ -0,0 +1,156 @@
+"""
+Bounded in-memory caches for the Telegram Synonym/Antonym Bot
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+def approx_size(obj: Any) -> int:
+    """Approximate the memory footprint of nested dicts, lists and strings."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += approx_size(key) + approx_size(value)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += approx_size(item)
+    return size
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with optional TTL expiry and byte budget.
+
+    Entries are evicted least-recently-used first whenever the entry count
+    or the approximate byte size exceeds its limit. Expired entries are
+    dropped when they are read and swept from the cold end on every write.
+
+    Every stored value gets a new version number, so derived data (such as
+    rendered responses) can detect that the entry it was built from changed.
+    """
+
+    def __init__(
+            self,
+            max_entries: int,
+            max_bytes: Optional[int] = None,
+            ttl: Optional[float] = None,
+            sizeof: Callable[[Any], int] = approx_size
+    ) -> None:
+        """
+        Args:
+            max_entries: Maximum number of entries
+            max_bytes: Approximate byte budget for all values (None = unbounded)
+            ttl: Seconds an entry stays valid after it is stored (None = forever)
+            sizeof: Function estimating the size of a value in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizeof = sizeof
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default on a miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, size, _, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key, size)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting old entries to stay within the limits."""
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._version += 1
+            self._data[key] = (expires_at, size, self._version, value)
+            self._bytes += size
+            self._sweep()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            self._remove(key, entry[1])
+            return entry[3]
+
+    def version(self, key: Hashable) -> Optional[int]:
+        """Return the version of a live entry without counting a hit or miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or (entry[0] is not None and entry[0] <= time.monotonic()):
+                return None
+            return entry[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[0] is None or entry[0] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss, eviction and size counters."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self._data),
+                'bytes': self._bytes
+            }
+
+    def _remove(self, key: Hashable, size: int) -> None:
+        del self._data[key]
+        self._bytes -= size
+
+    def _sweep(self) -> None:
+        """Drop expired entries from the cold end, then enforce the limits."""
+        now = time.monotonic()
+        while self._data:
+            key, (expires_at, size, _, _) = next(iter(self._data.items()))
+            if expires_at is None or expires_at > now:
+                break
+            self._remove(key, size)
+            self.expirations += 1
+
+        while self._data and (
+                len(self._data) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key, (_, size, _, _) = next(iter(self._data.items()))
+            self._remove(key, size)
+            self.evictions += 1
@@ -0,0 +1,118 @@
+"""
+Update dispatching shared by the Flask and asyncio entry points
+"""
+import logging
+import threading
+from typing import Any, Dict, List
+
+from telegram import Bot, BotCommand, Update
+from telegram.ext import (
+    Dispatcher, CommandHandler, MessageHandler, Filters,
+    CallbackQueryHandler, ConversationHandler, InlineQueryHandler
+)
+from .bot_handlers import (
+    start_command, help_command, synonym_command, antonym_command,
+    both_command, save_word_command, show_saved_command, text_handler,
+    button_handler, download_saved_command, inline_query_handler, word_list_handler,
+    AWAITING_WORD, AWAITING_SAVE_PATH
+)
+from .history_journal import get_history_journal
+from .metrics import track_update
+from .startup import startup_step
+from .thesaurus_index import get_thesaurus_index
+from .warmup import start_warmup
+from .wordnet_utils import get_wordnet, is_wordnet_loaded
+
+logger = logging.getLogger(__name__)
+
+BOT_COMMANDS: List[BotCommand] = [
+    BotCommand("start", "Start the bot and get welcome message"),
+    BotCommand("help", "Show help information"),
+    BotCommand("synonym", "Find synonyms for a word"),
+    BotCommand("antonym", "Find antonyms for a word"),
+    BotCommand("both", "Find both synonyms and antonyms"),
+    BotCommand("save", "Save a word to your list"),
+    BotCommand("saved", "View your saved words"),
+    BotCommand("download", "Download your saved words as a file")
+]
+
+
+def build_conversation_handler() -> ConversationHandler:
+    """Create the conversation handler with all bot commands and buttons."""
+    return ConversationHandler(
+        entry_points=[
+            CommandHandler("start", start_command),
+            CommandHandler("help", help_command),
+            CommandHandler("synonym", synonym_command),
+            CommandHandler("antonym", antonym_command),
+            CommandHandler("both", both_command),
+            CommandHandler("save", save_word_command),
+            CommandHandler("saved", show_saved_command),
+            CommandHandler("download", download_saved_command),
+            CallbackQueryHandler(button_handler)
+        ],
+        states={
+            AWAITING_WORD: [
+                MessageHandler(Filters.text & ~Filters.command, text_handler),
+                CallbackQueryHandler(button_handler)
+            ],
+            AWAITING_SAVE_PATH: [
+                MessageHandler(Filters.text & ~Filters.command, text_handler),
+                CallbackQueryHandler(button_handler)
+            ]
+        },
+        fallbacks=[
+            CommandHandler("start", start_command),
+            CommandHandler("help", help_command),
+            CallbackQueryHandler(button_handler)
+        ]
+    )
+
+
+def create_dispatcher(bot: Bot) -> Dispatcher:
+    """
+    Create a dispatcher that runs handlers in the calling thread.
+
+    Both entry points call ``process_update`` themselves: the Flask app from
+    the request thread, the asyncio server from its worker threads.
+    """
+    dispatcher = Dispatcher(bot, None, workers=0)
+    dispatcher.add_handler(build_conversation_handler())
+    # Inline queries aren't tied to a chat, so they stay out of the conversation
+    dispatcher.add_handler(InlineQueryHandler(inline_query_handler))
+    # Word list uploads are accepted in any conversation state
+    dispatcher.add_handler(MessageHandler(Filters.document.file_extension('txt'), word_list_handler))
+
+    # Replay history entries left in the journal and start the background writer
+    with startup_step('history journal'):
+        get_history_journal()
+
+    # Load WordNet in the background so the first lookup that needs it
+    # doesn't pay for it. With the thesaurus index most lookups don't, and
+    # the process reports ready meanwhile, but regular inflections and words
+    # missing from the index still do.
+    threading.Thread(target=get_wordnet, name='wordnet-load', daemon=True).start()
+
+    # Precompute the most popular words in the background
+    start_warmup()
+    return dispatcher
+
+
+def process_update(dispatcher: Dispatcher, update: Update) -> None:
+    """Run the handlers for an update, recording its metrics."""
+    with track_update():
+        dispatcher.process_update(update)
+
+
+def readiness() -> Dict[str, Any]:
+    """Whether this process is warm enough to answer lookups quickly."""
+    wordnet = is_wordnet_loaded()
+    index = get_thesaurus_index() is not None
+    # The index answers most lookups while WordNet is still loading in the background
+    return {'ready': index or wordnet, 'wordnet': wordnet, 'index': index}
+
+
+def setup_bot_commands(bot: Bot) -> None:
+    """Set up the bot's command menu."""
+    bot.set_my_commands(BOT_COMMANDS)
+    logger.info("Bot commands menu has been set up")
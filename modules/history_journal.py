@@ -0,0 +1,206 @@
+"""
+Write-behind lookup history for the Telegram Synonym/Antonym Bot
+
+Handlers only append history entries to an in-memory buffer. A background
+thread writes the buffer to an append-only JSON Lines journal in batches
+(on a timer, or sooner once the buffer reaches a size threshold) and
+periodically compacts the journal into the user store. Entries that were
+journaled but not yet compacted are replayed on startup, so a crash loses
+at most the last flush interval.
+"""
+import atexit
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import (
+    HISTORY_JOURNAL_PATH, HISTORY_FLUSH_SIZE, HISTORY_FLUSH_INTERVAL,
+    HISTORY_COMPACT_INTERVAL
+)
+from .user_store import UserStore, HISTORY_LIMIT, get_user_store
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryJournal:
+    """Append-only history journal with batched flushes and compaction."""
+
+    def __init__(
+            self,
+            store: UserStore,
+            path: str = HISTORY_JOURNAL_PATH,
+            flush_size: int = HISTORY_FLUSH_SIZE,
+            flush_interval: float = HISTORY_FLUSH_INTERVAL,
+            compact_interval: float = HISTORY_COMPACT_INTERVAL
+    ) -> None:
+        self.store = store
+        self.path = path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self._buffer: List[Dict[str, Any]] = []
+        # Entries of this process that are journaled but not yet compacted
+        self._flushed: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def _compacting_path(self) -> str:
+        return self.path + '.compacting'
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Serialise journal file access between worker processes."""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path + '.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def append(self, user_id: int, word: str, language: str) -> None:
+        """Queue a history entry; never touches the disk."""
+        entry = {'user_id': str(user_id), 'word': word, 'language': language}
+        with self._lock:
+            self._buffer.append(entry)
+            full = len(self._buffer) >= self.flush_size
+        if full:
+            self._wake.set()
+
+    def get_history(self, user_id: int, limit: int = HISTORY_LIMIT) -> List[Dict[str, Any]]:
+        """Get the user's history including entries that are not compacted yet."""
+        history = list(self.store.get_history(user_id))
+        user_id = str(user_id)
+        with self._lock:
+            pending = [e for e in self._flushed + self._buffer if e['user_id'] == user_id]
+        for entry in pending:
+            if entry['word'] not in [item['word'] for item in history]:
+                history.append({'word': entry['word']})
+        return history[-limit:]
+
+    def flush(self) -> int:
+        """Write buffered entries to the journal; return how many were written."""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+        data = ''.join(json.dumps(entry) + '\n' for entry in batch)
+        try:
+            with self._file_lock():
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+        except OSError:
+            # Keep the batch ahead of newer entries for the next flush; a
+            # partly written batch is replayed twice, which adding history
+            # entries tolerates
+            with self._lock:
+                self._buffer[:0] = batch
+            logger.warning("History journal write failed, keeping %d entries for the next flush", len(batch))
+            raise
+        with self._lock:
+            self._flushed.extend(batch)
+        return len(batch)
+
+    def compact(self) -> int:
+        """Fold the journal into the user store; return the number of replayed entries."""
+        self.flush()
+        with self._file_lock():
+            with self._lock:
+                done = len(self._flushed)
+            replayed = 0
+            # A leftover compaction file means a previous run crashed midway;
+            # finish it before starting on the current journal
+            if os.path.exists(self._compacting_path):
+                replayed += self._fold()
+            if os.path.exists(self.path):
+                os.replace(self.path, self._compacting_path)
+                replayed += self._fold()
+
+        with self._lock:
+            del self._flushed[:done]
+        if replayed:
+            logger.info("Compacted %d history entries into the user store", replayed)
+        return replayed
+
+    def _fold(self) -> int:
+        """Apply the compaction file to the store and remove it."""
+        entries = []
+        with open(self._compacting_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning("Skipping corrupt history journal line")
+        if entries:
+            self.store.add_history_many(entries)
+        os.remove(self._compacting_path)
+        return len(entries)
+
+    def start(self) -> None:
+        """Replay uncompacted entries and start the background writer."""
+        if self._thread is not None:
+            return
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error("Error replaying history journal: %s", e)
+        self._thread = threading.Thread(target=self._run, name='history-journal', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Stop the background writer and compact everything still pending."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error("Error compacting history journal: %s", e)
+
+    def _run(self) -> None:
+        next_compact = time.monotonic() + self.compact_interval
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                if time.monotonic() >= next_compact:
+                    self.compact()
+                    next_compact = time.monotonic() + self.compact_interval
+                else:
+                    self.flush()
+            except Exception as e:
+                logger.error("Error writing history journal: %s", e)
+
+
+_journal: Optional[HistoryJournal] = None
+_journal_lock = threading.Lock()
+
+
+def get_history_journal() -> HistoryJournal:
+    """Get the process-wide history journal, replaying it on first use."""
+    global _journal
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                journal = HistoryJournal(get_user_store())
+                journal.start()
+                _journal = journal
+    return _journal
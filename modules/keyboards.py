@@ -1,10 +1,28 @@
 """
 Telegram bot keyboard layouts
+
+The fixed keyboards are built once per language and serialised once; the
+same objects are attached to every reply.
 """
+import functools
+from typing import Sequence
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from config import CALLBACK_DATA
 from .languages import get_message
 
+class PrebuiltKeyboard(InlineKeyboardMarkup):
+    """An inline keyboard that is serialised when it is created rather than on every send."""
+
+    __slots__ = ('_json',)
+
+    def __init__(self, inline_keyboard, **_kwargs) -> None:
+        super().__init__(inline_keyboard, **_kwargs)
+        self._json = super().to_json()
+
+    def to_json(self) -> str:
+        return self._json
+
+@functools.lru_cache(maxsize=None)
 def get_main_keyboard(lang: str) -> InlineKeyboardMarkup:
     """Get the main menu keyboard."""
     keyboard = [
@@ -24,11 +42,59 @@ def get_main_keyboard(lang: str) -> InlineKeyboardMarkup:
             InlineKeyboardButton(get_message('switch_lang_btn', lang), callback_data=CALLBACK_DATA['SWITCH_LANG'])
         ]
     ]
-    return InlineKeyboardMarkup(keyboard)
+    return PrebuiltKeyboard(keyboard)
 
+def get_suggestions_keyboard(lang: str, mode: str, suggestions: Sequence[str]) -> InlineKeyboardMarkup:
+    """Get the main menu keyboard with a button to look up each spelling suggestion."""
+    buttons = []
+    for word in suggestions:
+        callback_data = f"{CALLBACK_DATA['LOOKUP']}:{mode}:{word}"
+        # Telegram rejects callback data over 64 bytes
+        if len(callback_data.encode('utf-8')) <= 64:
+            buttons.append(InlineKeyboardButton(word.replace('_', ' '), callback_data=callback_data))
+    keyboard = get_main_keyboard(lang).inline_keyboard
+    return InlineKeyboardMarkup([buttons] + list(keyboard) if buttons else keyboard)
+
+def get_result_page_keyboard(lang: str, token: str, page: int, pages: int) -> InlineKeyboardMarkup:
+    """Get the main menu keyboard with navigation between the pages of a long response."""
+    navigation = []
+    if page > 0:
+        navigation.append(InlineKeyboardButton(
+            get_message('prev_page_btn', lang),
+            callback_data=f"{CALLBACK_DATA['RESULT_PAGE']}:{token}:{page - 1}"
+        ))
+    if page < pages - 1:
+        navigation.append(InlineKeyboardButton(
+            get_message('next_page_btn', lang),
+            callback_data=f"{CALLBACK_DATA['RESULT_PAGE']}:{token}:{page + 1}"
+        ))
+    keyboard = get_main_keyboard(lang).inline_keyboard
+    return InlineKeyboardMarkup([navigation] + list(keyboard) if navigation else keyboard)
+
+@functools.lru_cache(maxsize=None)
 def get_back_keyboard(lang: str) -> InlineKeyboardMarkup:
     """Get the back button keyboard."""
     keyboard = [[
         InlineKeyboardButton(get_message('back_btn', lang), callback_data=CALLBACK_DATA['BACK'])
     ]]
-    return InlineKeyboardMarkup(keyboard) 
\ No newline at end of file
+    return PrebuiltKeyboard(keyboard)
+
+def get_saved_words_keyboard(lang: str, page: int, pages: int, collection: str = '') -> InlineKeyboardMarkup:
+    """Get the saved words keyboard with page navigation."""
+    navigation = []
+    if page > 0:
+        navigation.append(InlineKeyboardButton(
+            get_message('prev_page_btn', lang),
+            callback_data=f"{CALLBACK_DATA['SAVED_PAGE']}:{page - 1}:{collection}"
+        ))
+    if page < pages - 1:
+        navigation.append(InlineKeyboardButton(
+            get_message('next_page_btn', lang),
+            callback_data=f"{CALLBACK_DATA['SAVED_PAGE']}:{page + 1}:{collection}"
+        ))
+    keyboard = [navigation] if navigation else []
+    keyboard.append([
+        InlineKeyboardButton(get_message('download_saved_btn', lang), callback_data=CALLBACK_DATA['DOWNLOAD_SAVED']),
+        InlineKeyboardButton(get_message('back_btn', lang), callback_data=CALLBACK_DATA['BACK'])
+    ])
+    return InlineKeyboardMarkup(keyboard)
@@ -14,8 +14,9 @@ MESSAGES = {
             "• /synonym <слово> - Найти синонимы\n"
             "• /antonym <слово> - Найти антонимы\n"
             "• /both <слово> - Показать синонимы и антонимы\n"
-            "• /save <слово> - Сохранить слово\n"
-            "• /saved - Показать сохранённые слова\n"
+            "• /save <слово> [коллекция] - Сохранить слово\n"
+            "• /saved [коллекция] [страница] - Показать сохранённые слова\n"
+            "• /download [коллекция] - Скачать сохранённые слова\n"
             "• /help - Показать это сообщение\n\n"
             "*💾 Сохранение слов:*\n"
             "1. Используйте /save для сохранения слова\n"
@@ -27,8 +28,9 @@ MESSAGES = {
             "• /synonym <слово> - Найти синонимы\n"
             "• /antonym <слово> - Найти антонимы\n"
             "• /both <слово> - Показать всё\n"
-            "• /save <слово> - Сохранить слово\n"
-            "• /saved - Сохранённые слова\n"
+            "• /save <слово> [коллекция] - Сохранить слово\n"
+            "• /saved [коллекция] - Сохранённые слова\n"
+            "• /download - Скачать сохранённые слова\n"
             "• /help - Помощь\n\n"
             "Пример: Попробуйте '/both happy'\n\n"
             "Для каждого слова вы получите:\n"
@@ -51,17 +53,40 @@ MESSAGES = {
         'back_btn': "⬅️ Назад",
         'provide_word': "Введите слово для {}:",
         'word_not_found': "❌ Слово не найдено. Проверьте правильность написания.",
+        'did_you_mean': "❌ Слово не найдено. Возможно, вы имели в виду: {}?",
+        'inline_no_synonyms': "Синонимы не найдены",
+        'surface_form': "🔤 _{}_ → *{}*",
         'one_word_only': "❌ Пожалуйста, введите только одно слово.",
+        'batch_header': "📋 *Найдено слов: {} из {}*",
+        'batch_not_found': "❌ Не найдены: {}",
+        'batch_truncated': "⚠️ Обработаны только первые {} слов.",
+        'batch_file_ready': "📋 Найдено слов: {} из {}. Результаты в файле.",
+        'batch_file_too_large': "⚠️ Файл слишком большой. Максимальный размер: {} КБ.",
+        'batch_file_synonyms': "синонимы",
+        'batch_file_antonyms': "антонимы",
         'saved_words_empty': "📭 У вас пока нет сохранённых слов.",
         'saved_words_title': "📚 *Ваши сохранённые слова:*",
         'word_stats': "• *{}* - {} синонимов, {} антонимов",
         'word_saved': "✅ Слово '{}' сохранено!",
+        'word_saved_to': "✅ Слово '{}' сохранено в коллекцию '{}'!",
+        'collection_title': "🗂 Коллекция: *{}*",
+        'page_of': "Страница {} из {}",
+        'prev_page_btn': "◀️ Назад",
+        'next_page_btn': "Вперёд ▶️",
+        'result_expired': "⌛️ Этот результат устарел. Найдите слово ещё раз.",
+        'spelling_corrected': "Исправлено на",
+        'definition': "Определение",
+        'synonyms': "Синонимы",
+        'antonyms': "Антонимы",
+        'examples': "Примеры",
         'word_exists': "ℹ️ Слово '{}' уже в списке сохранённых.",
-        'max_words_reached': "⚠️ Достигнут лимит в {} слов. Скачайте текущий список, чтобы начать новый.",
+        'max_words_reached': "⚠️ Достигнут лимит в {} слов.",
         'download_ready': "📥 Ваш файл с сохранёнными словами готов к скачиванию!",
         'error_occurred': "❌ Произошла ошибка при обработке запроса. Пожалуйста, попробуйте еще раз позже.",
         'no_synonyms': "❌ Синонимы для слова '{}' не найдены.",
         'no_antonyms': "❌ Антонимы для слова '{}' не найдены.",
+        'antonym_via_similar': "Через: {} (близкое по смыслу слово)",
+        'antonym_via_derived': "Через: {} (однокоренное слово)",
         'no_results': "❌ Информация для слова '{}' не найдена."
     },
     'en': {
@@ -74,8 +99,9 @@ MESSAGES = {
             "• /synonym <word> - Find synonyms\n"
             "• /antonym <word> - Find antonyms\n"
             "• /both <word> - Show both synonyms and antonyms\n"
-            "• /save <word> - Save a word\n"
-            "• /saved - View saved words\n"
+            "• /save <word> [collection] - Save a word\n"
+            "• /saved [collection] [page] - View saved words\n"
+            "• /download [collection] - Download saved words\n"
             "• /help - Show this help message\n\n"
             "*💾 Saving Words:*\n"
             "1. Use /save to save a word\n"
@@ -87,8 +113,9 @@ MESSAGES = {
             "• /synonym <word> - Find synonyms\n"
             "• /antonym <word> - Find antonyms\n"
             "• /both <word> - Show both\n"
-            "• /save <word> - Save word\n"
-            "• /saved - View saved\n"
+            "• /save <word> [collection] - Save word\n"
+            "• /saved [collection] - View saved\n"
+            "• /download - Download saved\n"
             "• /help - Show help\n\n"
             "Example: Try '/both happy'\n\n"
             "For each word you'll get:\n"
@@ -111,17 +138,40 @@ MESSAGES = {
         'back_btn': "⬅️ Back",
         'provide_word': "Enter a word to {}:",
         'word_not_found': "❌ Word not found. Please check the spelling.",
+        'did_you_mean': "❌ Word not found. Did you mean: {}?",
+        'inline_no_synonyms': "No synonyms found",
+        'surface_form': "🔤 _{}_ → *{}*",
         'one_word_only': "❌ Please enter only one word.",
+        'batch_header': "📋 *Found {} of {} words*",
+        'batch_not_found': "❌ Not found: {}",
+        'batch_truncated': "⚠️ Only the first {} words were looked up.",
+        'batch_file_ready': "📋 Found {} of {} words. The results are in the file.",
+        'batch_file_too_large': "⚠️ The file is too large. The maximum size is {} KB.",
+        'batch_file_synonyms': "synonyms",
+        'batch_file_antonyms': "antonyms",
         'saved_words_empty': "📭 You don't have any saved words yet.",
         'saved_words_title': "📚 *Your saved words:*",
         'word_stats': "• *{}* - {} synonyms, {} antonyms",
         'word_saved': "✅ Word '{}' has been saved!",
+        'word_saved_to': "✅ Word '{}' has been saved to collection '{}'!",
+        'collection_title': "🗂 Collection: *{}*",
+        'page_of': "Page {} of {}",
+        'prev_page_btn': "◀️ Previous",
+        'next_page_btn': "Next ▶️",
+        'result_expired': "⌛️ This result has expired. Please look the word up again.",
+        'spelling_corrected': "Corrected to",
+        'definition': "Definition",
+        'synonyms': "Synonyms",
+        'antonyms': "Antonyms",
+        'examples': "Examples",
         'word_exists': "ℹ️ Word '{}' is already in your saved list.",
-        'max_words_reached': "⚠️ Maximum limit of {} words reached. Download current list to start a new one.",
+        'max_words_reached': "⚠️ Maximum limit of {} words reached.",
         'download_ready': "📥 Your saved words file is ready for download!",
         'error_occurred': "❌ An error occurred while processing your request. Please try again later.",
         'no_synonyms': "❌ No synonyms found for '{}'.",
         'no_antonyms': "❌ No antonyms found for '{}'.",
+        'antonym_via_similar': "Via: {} (similar word)",
+        'antonym_via_derived': "Via: {} (related form)",
         'no_results': "❌ No information found for '{}'."
     }
 }
@@ -0,0 +1,93 @@
+"""
+Logging configuration for the Telegram Synonym/Antonym Bot
+
+Handlers never run on the request thread: every logger feeds a
+``QueueHandler`` on the root logger and a ``QueueListener`` thread writes
+the records to stderr and the log file. Levels can be set per logger, and
+high-volume debug events are sampled so enabling debug output on a busy
+bot doesn't flood the log.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
+from config import LOG_FILE, LOG_LEVEL, LOG_LEVELS, LOG_DEBUG_SAMPLE_EVERY
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Pass one in ``every`` records at or below ``level``.
+
+    Records are counted per logger and message template (``record.msg``,
+    before the arguments are merged in), so a debug call inside a loop is
+    thinned out without hiding rarer debug events.
+    """
+
+    def __init__(self, every: int, level: int = logging.DEBUG) -> None:
+        super().__init__()
+        self.every = every
+        self.level = level
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.level or self.every <= 1:
+            return True
+        key = (record.name, str(record.msg))
+        with self._lock:
+            seen = self._counts.get(key, 0)
+            self._counts[key] = seen + 1
+        return seen % self.every == 0
+
+
+def setup_logging(level: str = LOG_LEVEL, module_levels: Optional[Dict[str, str]] = None,
+                  log_file: Optional[str] = LOG_FILE, sample_every: int = LOG_DEBUG_SAMPLE_EVERY) -> None:
+    """
+    Route all logging through a background listener thread.
+
+    Safe to call more than once; only the first call configures logging.
+
+    Args:
+        level: Root log level
+        module_levels: Levels of individual loggers, e.g. ``{'modules.wordnet_utils': 'DEBUG'}``
+        log_file: File to append records to in addition to stderr (None or empty for stderr only)
+        sample_every: Keep one in this many debug records of each message
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        formatter = logging.Formatter(LOG_FORMAT)
+        handlers = [logging.StreamHandler()]
+        if log_file:
+            os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+            handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(sample_every))
+
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(level.upper())
+        for name, module_level in (LOG_LEVELS if module_levels is None else module_levels).items():
+            logging.getLogger(name).setLevel(module_level.upper())
+
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        # Flush what is still queued when the process exits
+        atexit.register(_listener.stop)
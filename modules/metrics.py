@@ -0,0 +1,274 @@
+"""
+Runtime metrics for the Telegram Synonym/Antonym Bot
+
+A small in-process registry of counters, histograms and gauges rendered
+in the Prometheus text exposition format by the ``/metrics`` route.
+Request stages (parse, lookup, format, send, persist) and handlers are
+timed into histograms; caches and the outbound send queue register
+collectors that are read when the metrics are scraped.
+"""
+import contextlib
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow sends
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+# (name, type, help, [(labels, value)])
+Family = Tuple[str, str, str, List[Tuple[Labels, float]]]
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    type = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _labels(self, labels: Dict[str, Any]) -> Labels:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    @abstractmethod
+    def collect(self) -> Iterable[Family]:
+        """The metric's families as (name, type, help, samples)."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type = 'counter'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._labels(labels), 0)
+
+    def collect(self) -> Iterable[Family]:
+        with self._lock:
+            samples = list(self._values.items())
+        yield self.name, self.type, self.help, samples
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed cumulative buckets."""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # labels -> [bucket counts..., sum]
+        self._values: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._labels(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * len(self.buckets) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            counts[-1] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the ``with`` block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def collect(self) -> Iterable[Family]:
+        with self._lock:
+            values = [(key, list(counts)) for key, counts in self._values.items()]
+        samples = []
+        for key, counts in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append((key + (('le', _format_value(bound)),), cumulative, '_bucket'))
+            samples.append((key, counts[-1], '_sum'))
+            samples.append((key, cumulative, '_count'))
+        for suffix in ('_bucket', '_sum', '_count'):
+            yield (self.name + suffix, self.type if suffix == '_bucket' else '', self.help,
+                   [(labels, value) for labels, value, kind in samples if kind == suffix])
+
+
+class Registry:
+    """All metrics and collectors of the process."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[Family]]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            self._metrics[metric.name] = metric
+
+    def register_collector(self, name: str, collector: Callable[[], Iterable[Family]]) -> None:
+        """Add (or replace) a callback producing metric families at scrape time."""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def collect(self) -> List[Family]:
+        with self._lock:
+            sources = [metric.collect for metric in self._metrics.values()] + list(self._collectors.values())
+        families = []
+        for source in sources:
+            families.extend(source())
+        return families
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        # Families with the same name (e.g. from several caches) share one header
+        merged: Dict[str, Family] = {}
+        for name, type_, help_text, samples in self.collect():
+            if name in merged:
+                merged[name][3].extend(samples)
+            else:
+                merged[name] = (name, type_, help_text, list(samples))
+
+        lines = []
+        for name, type_, help_text, samples in merged.values():
+            if type_:
+                base = name[:-len('_bucket')] if type_ == 'histogram' else name
+                lines.append(f'# HELP {base} {help_text}')
+                lines.append(f'# TYPE {base} {type_}')
+            for labels, value in samples:
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# Content type of the Prometheus text format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+STAGE_SECONDS = Histogram('synant_stage_seconds', 'Time spent in each request stage', ('stage',))
+HANDLER_SECONDS = Histogram('synant_handler_seconds', 'Time spent in each update handler', ('handler',))
+UPDATE_SECONDS = Histogram('synant_update_seconds', 'Total time spent processing an update')
+UPDATES = Counter('synant_updates_total', 'Updates processed', ('status',))
+WORDNET_CALLS = Counter('synant_wordnet_calls_total', 'WordNet queries (lookups not served from a cache or the index)')
+WORDNET_CALLS_PER_UPDATE = Histogram('synant_wordnet_calls_per_update', 'WordNet queries made while processing an update',
+                                     buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500))
+
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def uninstrumented() -> Iterator[None]:
+    """Leave work done in the ``with`` block (e.g. cache warm-up) out of the request metrics."""
+    previous = getattr(_local, 'suppressed', False)
+    _local.suppressed = True
+    try:
+        yield
+    finally:
+        _local.suppressed = previous
+
+
+def stage(name: str):
+    """Time a request stage: ``with stage('lookup'): ...``."""
+    if getattr(_local, 'suppressed', False):
+        return contextlib.nullcontext()
+    return STAGE_SECONDS.time(stage=name)
+
+
+def count_wordnet_call(calls: int = 1) -> None:
+    """Record queries against the WordNet corpus."""
+    if getattr(_local, 'suppressed', False):
+        return
+    WORDNET_CALLS.inc(calls)
+    _local.wordnet_calls = getattr(_local, 'wordnet_calls', 0) + calls
+
+
+@contextlib.contextmanager
+def track_update() -> Iterator[None]:
+    """Time an update and count the WordNet queries made while handling it."""
+    _local.wordnet_calls = 0
+    start = time.perf_counter()
+    status = 'error'
+    try:
+        yield
+        status = 'ok'
+    finally:
+        UPDATE_SECONDS.observe(time.perf_counter() - start)
+        UPDATES.inc(status=status)
+        WORDNET_CALLS_PER_UPDATE.observe(_local.wordnet_calls)
+
+
+def register_cache(name: str, stats: Callable[[], Dict[str, int]]) -> None:
+    """Expose a cache's ``stats()`` counters and hit ratio as ``synant_cache_*{cache=name}``."""
+
+    def collect() -> Iterable[Family]:
+        values = stats()
+        labels = (('cache', name),)
+        lookups = values['hits'] + values['misses']
+        yield 'synant_cache_hits_total', 'counter', 'Cache hits', [(labels, values['hits'])]
+        yield 'synant_cache_misses_total', 'counter', 'Cache misses', [(labels, values['misses'])]
+        yield 'synant_cache_hit_ratio', 'gauge', 'Share of cache lookups that were hits', \
+            [(labels, values['hits'] / lookups if lookups else 0.0)]
+        for key in ('evictions', 'expirations'):
+            if key in values:
+                yield f'synant_cache_{key}_total', 'counter', f'Cache {key}', [(labels, values[key])]
+        for key in ('entries', 'bytes'):
+            if key in values:
+                yield f'synant_cache_{key}', 'gauge', f'Cache {key}', [(labels, values[key])]
+
+    REGISTRY.register_collector(f'cache:{name}', collect)
+
+
+def register_gauges(name: str, help_texts: Dict[str, str], values: Callable[[], Dict[str, float]],
+                    types: Optional[Dict[str, str]] = None) -> None:
+    """Expose each key of ``values()`` as ``synant_<name>_<key>`` (with ``_total`` for counters)."""
+    types = types or {}
+
+    def collect() -> Iterable[Family]:
+        current = values()
+        for key, help_text in help_texts.items():
+            type_ = types.get(key, 'gauge')
+            suffix = '_total' if type_ == 'counter' else ''
+            yield f'synant_{name}_{key}{suffix}', type_, help_text, [((), current[key])]
+
+    REGISTRY.register_collector(name, collect)
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,149 @@
+"""
+Morphological normalisation for the Telegram Synonym/Antonym Bot
+
+"runs", "ran" and "run" have the same synonyms, but looked up as typed
+each is expanded and cached on its own, and only the base form is in the
+precompiled thesaurus index. Lookups therefore go through
+``canonical_form`` first, which maps an inflected word to its WordNet
+lemma: irregular forms through a table merged from WordNet's exception
+lists offline, regular ones through ``morphy``'s suffix rules. A word that
+is itself a lemma (such as "running" or "glasses") is left alone, since its
+own entry is what the user asked for.
+
+Build the table with:
+
+    python -m modules.morphology [output_path]
+"""
+import functools
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+from config import MORPHOLOGY_TABLE_PATH
+from .metrics import register_cache
+from .thesaurus_index import get_thesaurus_index
+from .wordnet_utils import get_wordnet
+
+logger = logging.getLogger(__name__)
+
+# Parts of speech in the order morphy tries them, with their exception list files
+_EXCEPTION_FILES = {'n': 'noun.exc', 'v': 'verb.exc', 'a': 'adj.exc', 'r': 'adv.exc'}
+
+_exceptions: Optional[Dict[str, str]] = None
+_exceptions_lock = threading.Lock()
+
+
+def is_lemma(word: str) -> bool:
+    """Whether a word is a WordNet lemma, answered by the thesaurus index without loading WordNet when it is built."""
+    index = get_thesaurus_index()
+    if index is not None:
+        return word in index
+    return bool(get_wordnet().lemmas(word))
+
+
+def build_exception_table(wordnet) -> Dict[str, str]:
+    """
+    Irregular form -> base lemma, from WordNet's per-POS exception lists.
+
+    A form listed for several parts of speech maps to the base morphy
+    would try first.
+    """
+    table: Dict[str, str] = {}
+    for filename in reversed(list(_EXCEPTION_FILES.values())):
+        with wordnet.open(filename) as f:
+            for line in f:
+                form, *bases = line.split()
+                for base in bases:
+                    if is_lemma(base):
+                        table[form] = base
+                        break
+    return table
+
+
+def build_table(path: str = MORPHOLOGY_TABLE_PATH) -> int:
+    """
+    Write the irregular form table for the installed WordNet.
+
+    Args:
+        path: Output file path
+
+    Returns:
+        Number of irregular forms in the table
+    """
+    table = build_exception_table(get_wordnet())
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(table, f, separators=(',', ':'), sort_keys=True)
+    os.replace(tmp_path, path)
+    logger.info("Morphology table written to %s (%d forms)", path, len(table))
+    return len(table)
+
+
+def _exception_table() -> Dict[str, str]:
+    """The prebuilt irregular form table, empty if it hasn't been built (``morphy`` still covers those forms)."""
+    global _exceptions
+    if _exceptions is None:
+        with _exceptions_lock:
+            if _exceptions is None:
+                table: Dict[str, str] = {}
+                if os.path.exists(MORPHOLOGY_TABLE_PATH):
+                    try:
+                        with open(MORPHOLOGY_TABLE_PATH, encoding='utf-8') as f:
+                            table = json.load(f)
+                        logger.info("Morphology table loaded (%d forms)", len(table))
+                    except (OSError, ValueError) as e:
+                        logger.error("Error loading morphology table: %s", e)
+                else:
+                    logger.info("Morphology table not found, irregular forms go through morphy")
+                _exceptions = table
+    return _exceptions
+
+
+@functools.lru_cache(maxsize=16384)
+def canonical_form(word: str) -> str:
+    """
+    The lemma to look a word up under.
+
+    Lemmas are recognised through the thesaurus index and irregular forms
+    through the prebuilt table, so WordNet is only needed for regular
+    inflections (and anything else the two don't cover).
+
+    Args:
+        word: Lowercased word as the user typed it
+
+    Returns:
+        The word itself if it is a WordNet lemma or has no known base form,
+        otherwise its base form
+    """
+    if is_lemma(word):
+        return word
+    base = _exception_table().get(word)
+    if base is None:
+        base = get_wordnet().morphy(word)
+    if base and base != word:
+        logger.debug("Normalised '%s' to '%s'", word, base)
+        return base
+    return word
+
+
+register_cache('morphology', lambda: {
+    'hits': canonical_form.cache_info().hits,
+    'misses': canonical_form.cache_info().misses,
+    'entries': canonical_form.cache_info().currsize
+})
+
+
+if __name__ == '__main__':
+    import argparse
+
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+    parser = argparse.ArgumentParser(description="Build the irregular form table")
+    parser.add_argument('path', nargs='?', default=MORPHOLOGY_TABLE_PATH)
+    args = parser.parse_args()
+    build_table(args.path)
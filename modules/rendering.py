@@ -0,0 +1,482 @@
+"""
+Rendering for the Telegram Synonym/Antonym Bot
+
+Everything that turns word records into message text lives here: escaping
+for Telegram's parse modes, message templates, the response formatters,
+splitting responses into messages or pages, and the rendered response
+cache. WordNet's lemmas, definitions and examples recur across many
+responses, so each is escaped once and the escaped form is reused.
+"""
+import functools
+import logging
+import secrets
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from telegram import ParseMode
+
+from config import (
+    RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES, RESULT_PAGES_MAX_ENTRIES, RESULT_PAGES_TTL
+)
+from .antonym_graph import indirect_antonyms
+from .cache import LRUCache
+from .languages import get_message
+from .metrics import register_cache, stage
+from .spelling import suggest
+from .wordnet_utils import get_word_record, word_cache
+from .word_record import WordInfo
+
+logger = logging.getLogger(__name__)
+
+# Telegram's limit on the length of a single message
+MAX_MESSAGE_LENGTH = 4096
+
+# (word, mode, lang) -> (lookup entry version, word record, spelling suggestions, rendered sections)
+response_cache = LRUCache(RESPONSE_CACHE_MAX_ENTRIES, max_bytes=RESPONSE_CACHE_MAX_BYTES)
+register_cache('response', response_cache.stats)
+
+# Room left on each page for the typed form above it and the page number below it
+PAGE_RESERVE = 256
+
+# token -> (pages, line shown above the first page or None); the tokens
+# are in the navigation buttons' callback data
+result_pages = LRUCache(RESULT_PAGES_MAX_ENTRIES, ttl=RESULT_PAGES_TTL)
+register_cache('result_pages', result_pages.stats)
+
+
+# Characters with a meaning in each parse mode. Legacy Markdown has only a
+# few, and a chain of str.replace calls is faster than str.translate for
+# so few; the longer lists are escaped with translation tables.
+_MARKDOWN_SPECIAL = ('_', '*', '`', '[', ']')
+_MARKDOWN_V2_TABLE = str.maketrans({char: '\\' + char for char in '\\_*[]()~`>#+-=|{}.!'})
+_HTML_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+
+def escape_markdown(text: str) -> str:
+    """Escape Markdown special characters."""
+    for char in _MARKDOWN_SPECIAL:
+        if char in text:
+            text = text.replace(char, '\\' + char)
+    return text
+
+
+def escape_markdown_v2(text: str) -> str:
+    """Escape MarkdownV2 special characters."""
+    return text.translate(_MARKDOWN_V2_TABLE)
+
+
+def escape_html(text: str) -> str:
+    """Escape the characters HTML parse mode requires as entities."""
+    return text.translate(_HTML_TABLE)
+
+
+ESCAPERS: Dict[str, Callable[[str], str]] = {
+    ParseMode.MARKDOWN: escape_markdown,
+    ParseMode.MARKDOWN_V2: escape_markdown_v2,
+    ParseMode.HTML: escape_html
+}
+
+
+@functools.lru_cache(maxsize=65536)
+def escape_lexical(text: str) -> str:
+    """``escape_markdown`` for WordNet strings, which are escaped once and reused."""
+    return escape_markdown(text)
+
+
+register_cache('escape', lambda: {
+    'hits': escape_lexical.cache_info().hits,
+    'misses': escape_lexical.cache_info().misses,
+    'entries': escape_lexical.cache_info().currsize
+})
+
+
+@functools.lru_cache(maxsize=None)
+def message_template(key: str, lang: str) -> Callable[..., str]:
+    """The ``str.format`` of a message from ``languages``, looked up once per language."""
+    return get_message(key, lang).format
+
+
+NUMBER_EMOJIS = {
+    1: "1️⃣",
+    2: "2️⃣",
+    3: "3️⃣",
+    4: "4️⃣",
+    5: "5️⃣",
+    6: "6️⃣",
+    7: "7️⃣",
+    8: "8️⃣",
+    9: "9️⃣",
+    10: "🔟"
+}
+
+
+def get_number_emoji(n: int) -> str:
+    """Convert a number to its emoji representation."""
+    return NUMBER_EMOJIS.get(n, str(n))
+
+
+def format_word_info(word: str, info: Optional[Dict[str, Any]], mode: str, lang: str) -> str:
+    """Format word information for display with proper markdown and language support."""
+    return "\n".join(format_word_sections(word, info, mode, lang))
+
+
+def format_word_sections(word: str, info: Optional[Dict[str, Any]], mode: str, lang: str) -> Iterator[str]:
+    """
+    Format word information one part of speech at a time.
+
+    Yields the sections of ``format_word_info``'s text, which is the
+    sections joined by newlines. Markdown entities never span lines, so
+    the text can be split between any two sections or lines.
+    """
+    if info is None:
+        yield message_template('word_not_found', lang)(escape_markdown(word))
+        return
+    
+    escaped_word = escape_lexical(word)
+    
+    # Sort POS by their readable names
+    sorted_pos = sorted(info.keys(), key=lambda x: info[x]['pos_name'])
+    
+    # Parts of speech without direct antonyms fall back to the precomputed indirect ones
+    indirect = {}
+    if mode in ['antonym', 'both']:
+        lemma = '_'.join(word.lower().split())
+        indirect = {pos: indirect_antonyms(lemma, pos)
+                    for pos, pos_data in info.items() if not pos_data.get('antonyms')}
+    
+    # Check if there are any antonyms when in antonym mode
+    if mode == 'antonym':
+        has_antonyms = (any(pos_data.get('antonyms') for pos_data in info.values())
+                        or any(indirect.values()))
+        if not has_antonyms:
+            yield message_template('no_antonyms', lang)(escaped_word)
+            return
+    
+    # Check if there are any synonyms when in synonym mode
+    if mode == 'synonym':
+        has_synonyms = any(pos_data.get('synonyms') for pos_data in info.values())
+        if not has_synonyms:
+            yield message_template('no_synonyms', lang)(escaped_word)
+            return
+    
+    for i, pos in enumerate(sorted_pos, 1):
+        response = []
+        pos_data = info[pos]
+        pos_name = pos_data['pos_name']
+        
+        # Word type section with meaning
+        response.append(f"\n{get_number_emoji(i)} {escaped_word} as *{pos_name}*:")
+        if pos_data['meanings']:
+            response.append(f"Meaning: {escape_lexical(pos_data['meanings'][0])}")
+        
+        # Add main example if available
+        if pos_data['examples']:
+            response.append(f"Example:")
+            response.append(f"{escape_lexical(pos_data['examples'][0])}\n")
+        
+        # Synonyms section
+        if mode in ['synonym', 'both'] and pos_data['synonyms']:
+            response.append(f"\n📚 Synonyms for *{pos_name.lower()}* '{escaped_word}'\n")
+            for syn in pos_data['synonyms']:
+                response.append(f"• {escape_lexical(syn['word'])}")
+                response.append(f"Meaning: {escape_lexical(syn['meaning'])}")
+                if syn['examples']:
+                    response.append(f"Example: {escape_lexical(syn['examples'][0])}")
+                response.append("")  # Empty line between synonyms
+        
+        # Antonyms section
+        if mode in ['antonym', 'both'] and pos_data['antonyms']:
+            if mode == 'both':
+                response.append("\n")  # Extra line for separation
+            response.append(f"\n⚡️ Antonyms for *{pos_name.lower()}* '{escaped_word}'\n")
+            for ant in pos_data['antonyms']:
+                response.append(f"• {escape_lexical(ant['word'])}")
+                response.append(f"Meaning: {escape_lexical(ant['meaning'])}")
+                if ant['examples']:
+                    response.append(f"Example: {escape_lexical(ant['examples'][0])}")
+                response.append("")  # Empty line between antonyms
+        elif indirect.get(pos):
+            if mode == 'both':
+                response.append("\n")  # Extra line for separation
+            response.append(f"\n⚡️ Antonyms for *{pos_name.lower()}* '{escaped_word}'\n")
+            for ant, via, provenance in indirect[pos]:
+                response.append(f"• {escape_lexical(ant)}")
+                response.append(message_template(f'antonym_via_{provenance}', lang)(escape_lexical(via)))
+                response.append("")  # Empty line between antonyms
+        
+        # Add extra spacing between different parts of speech
+        response.append("\n")
+        yield "\n".join(response)
+    
+    if not sorted_pos:
+        yield message_template('no_results', lang)(escaped_word)
+
+
+def format_response(
+        word_info: Dict[str, Any],
+        request_type: str,
+        language: str,
+        is_corrected: bool = False,
+        corrected_word: Optional[str] = None
+) -> str:
+    """
+    Format a response from flat word information (the older ``formatter`` API).
+
+    Args:
+        word_info: Dictionary with 'word' and lists of 'definitions'
+            ({'definition', 'part_of_speech'}), 'synonyms', 'antonyms' and 'examples'
+        request_type: 'synonyms', 'antonyms', or 'both'
+        language: User's preferred language
+        is_corrected: Whether the word was corrected for spelling
+        corrected_word: The corrected word if applicable
+
+    Returns:
+        Formatted response string
+    """
+    word = word_info["word"]
+    response_parts = []
+
+    # Add spelling correction message if applicable
+    if is_corrected:
+        response_parts.append(f"*{get_message('spelling_corrected', language)}:* '{escape_markdown(corrected_word or '')}'")
+
+    # Add word header
+    response_parts.append(f"*{escape_lexical(word.upper())}*")
+
+    # Add definition
+    if word_info["definitions"]:
+        response_parts.append(f"\n*{get_message('definition', language)}:*")
+        for i, def_item in enumerate(word_info["definitions"][:3], 1):  # Limit to 3 definitions
+            pos = def_item.get("part_of_speech", "")
+            pos_text = f" ({pos})" if pos else ""
+            response_parts.append(f"{i}. {escape_lexical(def_item.get('definition', ''))}{pos_text}")
+
+    # Add synonyms and antonyms if requested
+    for kind in ('synonyms', 'antonyms'):
+        if request_type in [kind, 'both'] and word_info[kind]:
+            response_parts.append(f"\n*{get_message(kind, language)}:*")
+            response_parts.append("\n".join(
+                f"{i}. {escape_lexical(item)}" for i, item in enumerate(word_info[kind][:10], 1)  # Limit to 10
+            ))
+
+    # Add examples
+    if word_info["examples"]:
+        response_parts.append(f"\n*{get_message('examples', language)}:*")
+        response_parts.append("\n".join(
+            f"{i}. _{escape_lexical(example)}_" for i, example in enumerate(word_info["examples"][:3], 1)  # Limit to 3
+        ))
+
+    # Combine all parts
+    return "\n".join(response_parts)
+
+
+def _pieces(section: str, max_length: int) -> Iterator[str]:
+    """A section, or its lines if it is too long for a message, split further only if a line is."""
+    if len(section) <= max_length:
+        yield section
+        return
+    for line in section.split('\n'):
+        while len(line) > max_length:
+            cut = line.rfind(' ', 0, max_length)
+            if cut <= 0:
+                cut = max_length
+                # Never separate an escape from the character it escapes
+                if line[cut - 1] == '\\':
+                    cut -= 1
+            yield line[:cut]
+            line = line[cut:].lstrip(' ')
+        yield line
+
+
+def pack_sections(sections: Iterable[str], max_length: int = MAX_MESSAGE_LENGTH) -> Iterator[str]:
+    """
+    Pack sections of a response into as few messages as possible.
+
+    The sections are joined by newlines, and a message only ends between
+    two sections (or two lines of a section too long for one message), so
+    no ``*...*`` span or escape is cut in half. Each message is yielded as
+    soon as the section that doesn't fit into it is rendered.
+    """
+    current = None
+    sent = False
+    for section in sections:
+        for piece in _pieces(section, max_length):
+            if current is None:
+                current = piece
+            elif len(current) + 1 + len(piece) <= max_length:
+                current += '\n' + piece
+            else:
+                # Telegram rejects messages with nothing but whitespace
+                if current.strip():
+                    yield current
+                    sent = True
+                current = piece
+    if current is not None and (current.strip() or not sent):
+        yield current
+
+
+def split_message(text: str, max_length: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """Split a response into chunks that fit into a single Telegram message, between lines."""
+    return list(pack_sections([text], max_length))
+
+
+def format_suggestions(suggestions: Tuple[str, ...], lang: str) -> str:
+    """The "did you mean" reply for a word that wasn't found."""
+    words = ', '.join(f"*{escape_lexical(word.replace('_', ' '))}*" for word in suggestions)
+    return message_template('did_you_mean', lang)(words)
+
+
+def format_surface_form(word: str, lemma: str, lang: str) -> str:
+    """The line showing which word was typed, for a response rendered for its lemma."""
+    return message_template('surface_form', lang)(escape_markdown(word), escape_lexical(lemma.replace('_', ' ')))
+
+
+def with_surface_form(chunks: Iterable[str], word: str, lemma: str, lang: str) -> Iterator[str]:
+    """
+    Show which word was typed above a response rendered for its lemma.
+
+    The line is added per reply rather than cached, so every inflected form
+    shares the lemma's cached messages.
+    """
+    line = format_surface_form(word, lemma, lang)
+    chunks = iter(chunks)
+    first = next(chunks, '').lstrip('\n')
+    if len(line) + 2 + len(first) <= MAX_MESSAGE_LENGTH:
+        yield f"{line}\n\n{first}"
+    else:
+        yield line
+        yield first
+    yield from chunks
+
+
+def render_word_response(word: str, mode: str, lang: str) -> Tuple[Optional[WordInfo], List[str]]:
+    """
+    Look up and render a word, reusing the cached messages when possible.
+
+    Returns:
+        The word record (None if not found) and the list of messages to send
+    """
+    response = get_word_response(word, mode, lang)
+    return response.record, list(response.messages())
+
+
+def get_word_response(word: str, mode: str, lang: str) -> 'WordResponse':
+    """
+    Look up a word and start rendering its response.
+
+    Rendered sections are tied to the version of the lookup cache entry
+    they were built from, so a refreshed, evicted or expired lookup entry
+    invalidates them automatically.
+
+    Args:
+        word: Word to look up
+        mode: 'synonym', 'antonym' or 'both'
+        lang: Interface language
+
+    Returns:
+        The response, complete if it was cached, otherwise rendered as it is read
+    """
+    key = (word, mode, lang)
+    version = word_cache.version(word)
+    if version is not None:
+        cached = response_cache.get(key)
+        if cached is not None and cached[0] == version:
+            logger.debug("Returning cached response for word: %s (%s, %s)", word, mode, lang)
+            _, record, suggestions, sections = cached
+            return WordResponse(key, None, record, suggestions, sections)
+
+    with stage('lookup'):
+        record = get_word_record(word)
+    with stage('format'):
+        suggestions = suggest(word) if record is None else ()
+    if suggestions:
+        sections = iter([format_suggestions(suggestions, lang)])
+    else:
+        sections = format_word_sections(word, record.to_dict() if record else None, mode, lang)
+    return WordResponse(key, word_cache.version(word), record, suggestions, sections)
+
+
+class WordResponse:
+    """
+    A word's response, rendered one part of speech at a time as it is read.
+
+    The sections rendered so far are kept, so one rendering can be sent as
+    messages or, once it turns out to be long, as pages. The sections are
+    cached when the last one has been rendered.
+    """
+
+    def __init__(self, key: Tuple[str, str, str], version: Optional[int], record: Optional[WordInfo],
+                 suggestions: Tuple[str, ...], sections: Iterable[str]) -> None:
+        """
+        Args:
+            key: Response cache key
+            version: Lookup cache entry version to cache the sections under (None to not cache them)
+            record: Word record, None if the word wasn't found
+            suggestions: Spelling suggestions for a word that wasn't found
+            sections: Rendered sections, or a generator rendering them
+        """
+        self.record = record
+        self.suggestions = suggestions
+        self._key = key
+        self._version = version
+        if isinstance(sections, list):
+            self.sections = sections
+            self._pending: Optional[Iterator[str]] = None
+        else:
+            self.sections = []
+            self._pending = iter(sections)
+        self._length = sum(map(len, self.sections))
+
+    def _render_next(self) -> bool:
+        """Render one more section; False once all are rendered."""
+        if self._pending is None:
+            return False
+        with stage('format'):
+            section = next(self._pending, None)
+        if section is None:
+            self._pending = None
+            if self._version is not None:
+                response_cache.set(self._key, (self._version, self.record, self.suggestions, self.sections))
+            return False
+        self.sections.append(section)
+        self._length += len(section)
+        return True
+
+    def _iter_sections(self) -> Iterator[str]:
+        i = 0
+        while i < len(self.sections) or self._render_next():
+            yield self.sections[i]
+            i += 1
+
+    def messages(self) -> Iterator[str]:
+        """The messages to send, each yielded as soon as it is rendered."""
+        return pack_sections(self._iter_sections())
+
+    def is_long(self, threshold: int) -> bool:
+        """
+        Whether the response has several sections and more than ``threshold`` characters.
+
+        Sections are rendered only until the answer is known, so a short
+        response is never rendered further than its first message needs.
+        """
+        while (self._length <= threshold or len(self.sections) < 2) and self._render_next():
+            pass
+        return self._length > threshold and len(self.sections) > 1
+
+    def pages(self) -> List[str]:
+        """
+        The response split into pages of one part of speech each.
+
+        A part of speech too long for one message is split between lines
+        over several pages.
+        """
+        while self._render_next():
+            pass
+        return [page for section in self.sections
+                for page in pack_sections([section], MAX_MESSAGE_LENGTH - PAGE_RESERVE)]
+
+
+def store_result_pages(pages: List[str], header: Optional[str] = None) -> str:
+    """Keep a paginated response for its navigation buttons; returns its token."""
+    token = secrets.token_urlsafe(6)
+    result_pages.set(token, (pages, header))
+    return token
@@ -0,0 +1,186 @@
+"""
+Saved word collections for the Telegram Synonym/Antonym Bot
+
+Saved words live in a SQLite database with a unique index on
+(user, collection, word), so duplicate checks and inserts cost the same no
+matter how many words a user has, and listings are read one page at a time.
+Words saved to the legacy ``data/temp/saved_words_<id>.json`` files are
+imported the first time their owner uses the saved words commands.
+"""
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import SAVED_WORDS_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+LEGACY_SAVED_WORDS_PATH = 'data/temp/saved_words_{}.json'
+
+
+class SavedWordStore:
+    """Per-user saved words, optionally grouped into named collections."""
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS saved_words ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " user_id TEXT NOT NULL,"
+        " collection TEXT NOT NULL DEFAULT '',"
+        " word TEXT NOT NULL,"
+        " synonyms TEXT NOT NULL,"
+        " antonyms TEXT NOT NULL,"
+        " UNIQUE (user_id, collection, word))",
+    )
+
+    _ADD = (
+        "INSERT OR IGNORE INTO saved_words (user_id, collection, word, synonyms, antonyms) "
+        "VALUES (?, ?, ?, ?, ?)"
+    )
+    _EXISTS = "SELECT 1 FROM saved_words WHERE user_id = ? AND collection = ? AND word = ?"
+    _COUNT = "SELECT COUNT(*) FROM saved_words WHERE user_id = ?"
+    _COUNT_IN = "SELECT COUNT(*) FROM saved_words WHERE user_id = ? AND collection = ?"
+    _PAGE = (
+        "SELECT collection, word, synonyms, antonyms FROM saved_words "
+        "WHERE user_id = ? ORDER BY id LIMIT ? OFFSET ?"
+    )
+    _PAGE_IN = (
+        "SELECT collection, word, synonyms, antonyms FROM saved_words "
+        "WHERE user_id = ? AND collection = ? ORDER BY id LIMIT ? OFFSET ?"
+    )
+    _COLLECTIONS = (
+        "SELECT collection, COUNT(*) FROM saved_words WHERE user_id = ? "
+        "GROUP BY collection ORDER BY collection"
+    )
+
+    def __init__(self, path: str = SAVED_WORDS_DB_PATH,
+                 legacy_path: str = LEGACY_SAVED_WORDS_PATH) -> None:
+        self.path = path
+        self.legacy_path = legacy_path
+        self._local = threading.local()
+        self._migrated = set()
+        with self._transaction() as conn:
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        with conn:
+            yield conn
+
+    def _migrate_legacy(self, user_id: str) -> None:
+        """Import the user's legacy JSON file once, then rename it."""
+        if user_id in self._migrated:
+            return
+        path = self.legacy_path.format(user_id)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    saved_words = json.load(f)
+                if not isinstance(saved_words, list):
+                    saved_words = []
+                with self._transaction() as conn:
+                    for item in saved_words:
+                        conn.execute(self._ADD, (
+                            user_id, '', item['word'],
+                            json.dumps(item.get('synonyms', []), ensure_ascii=False),
+                            json.dumps(item.get('antonyms', []), ensure_ascii=False)
+                        ))
+                os.replace(path, path + '.migrated')
+                logger.info("Imported %d saved words for user %s", len(saved_words), user_id)
+            except (OSError, ValueError, KeyError) as e:
+                logger.error("Error importing saved words for user %s: %s", user_id, e)
+                return
+        self._migrated.add(user_id)
+
+    def add(self, user_id: int, word: str, synonyms: List[str], antonyms: List[str],
+            collection: str = '') -> bool:
+        """
+        Save a word unless it is already in the collection.
+
+        Returns:
+            True if the word was added
+        """
+        user_id = str(user_id)
+        self._migrate_legacy(user_id)
+        with self._transaction() as conn:
+            cursor = conn.execute(self._ADD, (
+                user_id, collection, word,
+                json.dumps(synonyms, ensure_ascii=False),
+                json.dumps(antonyms, ensure_ascii=False)
+            ))
+            return cursor.rowcount > 0
+
+    def contains(self, user_id: int, word: str, collection: str = '') -> bool:
+        user_id = str(user_id)
+        self._migrate_legacy(user_id)
+        return self._connect().execute(self._EXISTS, (user_id, collection, word)).fetchone() is not None
+
+    def count(self, user_id: int, collection: Optional[str] = None) -> int:
+        """Number of saved words, in one collection or in all of them."""
+        user_id = str(user_id)
+        self._migrate_legacy(user_id)
+        if collection is None:
+            row = self._connect().execute(self._COUNT, (user_id,)).fetchone()
+        else:
+            row = self._connect().execute(self._COUNT_IN, (user_id, collection)).fetchone()
+        return row[0]
+
+    def page(self, user_id: int, page: int, page_size: int,
+             collection: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Saved words on a zero-based page, in the order they were saved."""
+        user_id = str(user_id)
+        self._migrate_legacy(user_id)
+        if collection is None:
+            rows = self._connect().execute(self._PAGE, (user_id, page_size, page * page_size))
+        else:
+            rows = self._connect().execute(self._PAGE_IN, (user_id, collection, page_size, page * page_size))
+        return [self._to_item(row) for row in rows]
+
+    def collections(self, user_id: int) -> List[Tuple[str, int]]:
+        """The user's collections with their word counts."""
+        user_id = str(user_id)
+        self._migrate_legacy(user_id)
+        return self._connect().execute(self._COLLECTIONS, (user_id,)).fetchall()
+
+    def export(self, user_id: int, collection: Optional[str] = None) -> bytes:
+        """All saved words as the JSON document offered for download."""
+        items = self.page(user_id, 0, -1, collection)
+        return json.dumps(items, indent=2, ensure_ascii=False).encode('utf-8')
+
+    @staticmethod
+    def _to_item(row: Tuple[str, str, str, str]) -> Dict[str, Any]:
+        collection, word, synonyms, antonyms = row
+        item = {'word': word, 'synonyms': json.loads(synonyms), 'antonyms': json.loads(antonyms)}
+        if collection:
+            item['collection'] = collection
+        return item
+
+
+_store: Optional[SavedWordStore] = None
+_store_lock = threading.Lock()
+
+
+def get_saved_word_store() -> SavedWordStore:
+    """Get the process-wide saved word store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SavedWordStore()
+    return _store
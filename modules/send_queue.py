@@ -0,0 +1,259 @@
+"""
+Rate-limited outbound queue for Telegram Bot API calls
+
+Telegram allows roughly one message per second in a chat (short bursts
+are tolerated) and about thirty per second overall, and answers anything
+faster with 429 and a ``retry_after``. ``SendQueue`` pushes every call
+that targets a chat through a per-chat and a global token bucket, keeps
+the calls of each chat in submission order, and retries rate-limited
+calls after the delay Telegram asks for instead of letting handlers
+fall back to further sends.
+
+``QueuedBot`` routes the chat-bound API methods through the queue; the
+calling handler still waits for the result and sees the same exceptions.
+"""
+import functools
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from telegram import Bot
+from telegram.error import RetryAfter
+from telegram.utils.request import Request
+
+from .metrics import register_gauges, stage
+from config import (
+    SEND_GLOBAL_RATE, SEND_GLOBAL_BURST, SEND_CHAT_RATE, SEND_CHAT_BURST,
+    SEND_WORKERS, SEND_MAX_RETRIES, HTTP_POOL_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+# Bot API methods that send or change something in a chat
+QUEUED_METHODS = frozenset({
+    'sendMessage', 'sendDocument', 'sendPhoto', 'sendChatAction',
+    'editMessageText', 'editMessageReplyMarkup', 'deleteMessage'
+})
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens per second."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+class _Job:
+    __slots__ = ('func', 'args', 'future', 'attempts')
+
+    def __init__(self, func: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+        self.func = func
+        self.args = args
+        self.future: Future = Future()
+        self.attempts = 0
+
+
+class SendQueue:
+    """
+    Outbound call queue with per-chat ordering and token-bucket rate limits.
+
+    A chat is served by at most one worker at a time, so its calls run in
+    submission order; different chats are sent in parallel.
+    """
+
+    def __init__(
+            self,
+            workers: int = SEND_WORKERS,
+            global_rate: float = SEND_GLOBAL_RATE,
+            global_burst: float = SEND_GLOBAL_BURST,
+            chat_rate: float = SEND_CHAT_RATE,
+            chat_burst: float = SEND_CHAT_BURST,
+            max_retries: int = SEND_MAX_RETRIES
+    ) -> None:
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self._global = TokenBucket(global_rate, global_burst)
+        self._chat_buckets: Dict[Any, TokenBucket] = {}
+        self._pending: Dict[Any, Deque[_Job]] = {}
+        # (ready_at, seq, chat_id) for chats with pending jobs and no worker
+        self._ready: List[Tuple[float, int, Any]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._stats = {'sent': 0, 'failed': 0, 'retries': 0, 'retry_after_seconds': 0.0,
+                       'throttled': 0, 'max_depth': 0}
+        self._depth = 0
+        self._threads = [
+            threading.Thread(target=self._run, name=f'send-queue-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        register_gauges('send_queue', {
+            'depth': 'Calls waiting in the outbound queue',
+            'chats': 'Chats with queued calls',
+            'max_depth': 'Largest queue depth seen',
+            'sent': 'Calls sent',
+            'failed': 'Calls that failed',
+            'retries': 'Calls retried after retry_after',
+            'retry_after_seconds': 'Total retry_after delay requested by Telegram',
+            'throttled': 'Times a chat was delayed by a rate limit'
+        }, self.stats, types={key: 'counter' for key in ('sent', 'failed', 'retries', 'retry_after_seconds', 'throttled')})
+
+    def submit(self, chat_id: Any, func: Callable[..., Any], *args: Any) -> Future:
+        """Queue ``func(*args)`` behind earlier calls for the same chat."""
+        job = _Job(func, args)
+        with self._cond:
+            queue = self._pending.get(chat_id)
+            if queue is None:
+                queue = self._pending[chat_id] = deque()
+                self._schedule(chat_id, time.monotonic())
+            queue.append(job)
+            self._depth += 1
+            self._stats['max_depth'] = max(self._stats['max_depth'], self._depth)
+        return job.future
+
+    def call(self, chat_id: Any, func: Callable[..., Any], *args: Any) -> Any:
+        """Queue a call and wait for its result."""
+        return self.submit(chat_id, func, *args).result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and delivery counters."""
+        with self._cond:
+            return dict(self._stats, depth=self._depth, chats=len(self._pending))
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def _schedule(self, chat_id: Any, ready_at: float) -> None:
+        heapq.heappush(self._ready, (ready_at, next(self._seq), chat_id))
+        self._cond.notify()
+
+    def _next_job(self) -> Optional[Tuple[Any, _Job]]:
+        """Wait for a chat that may send now and reserve its tokens."""
+        with self._cond:
+            while not self._stopped:
+                now = time.monotonic()
+                if not self._ready:
+                    self._cond.wait()
+                    continue
+                ready_at, _, chat_id = self._ready[0]
+                if ready_at > now:
+                    self._cond.wait(ready_at - now)
+                    continue
+                heapq.heappop(self._ready)
+
+                bucket = self._chat_buckets.get(chat_id)
+                if bucket is None:
+                    bucket = self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+                wait = max(bucket.delay(now), self._global.delay(now))
+                if wait > 0:
+                    self._stats['throttled'] += 1
+                    self._schedule(chat_id, now + wait)
+                    continue
+                bucket.take()
+                self._global.take()
+                return chat_id, self._pending[chat_id][0]
+        return None
+
+    def _finish(self, chat_id: Any, delay: float = 0.0, done: bool = True) -> None:
+        """Release the chat after a call, rescheduling it if it has more work."""
+        with self._cond:
+            queue = self._pending[chat_id]
+            if done:
+                queue.popleft()
+                self._depth -= 1
+            if queue:
+                self._schedule(chat_id, time.monotonic() + delay)
+            else:
+                del self._pending[chat_id]
+                if len(self._chat_buckets) > 2 * len(self._pending) + 1024:
+                    self._prune_buckets()
+
+    def _prune_buckets(self) -> None:
+        """Forget idle chats whose buckets have refilled completely."""
+        now = time.monotonic()
+        for chat_id, bucket in list(self._chat_buckets.items()):
+            if chat_id not in self._pending:
+                bucket.delay(now)
+                if bucket.tokens >= bucket.capacity:
+                    del self._chat_buckets[chat_id]
+
+    def _run(self) -> None:
+        while True:
+            item = self._next_job()
+            if item is None:
+                return
+            chat_id, job = item
+            job.attempts += 1
+            try:
+                result = job.func(*job.args)
+            except RetryAfter as e:
+                if job.attempts > self.max_retries:
+                    self._fail(chat_id, job, e)
+                    continue
+                delay = float(e.retry_after)
+                with self._cond:
+                    self._stats['retries'] += 1
+                    self._stats['retry_after_seconds'] += delay
+                logger.warning("Rate limited in chat %s, retrying in %.1fs", chat_id, delay)
+                self._finish(chat_id, delay=delay, done=False)
+            except Exception as e:
+                self._fail(chat_id, job, e)
+            else:
+                with self._cond:
+                    self._stats['sent'] += 1
+                job.future.set_result(result)
+                self._finish(chat_id)
+
+    def _fail(self, chat_id: Any, job: _Job, error: Exception) -> None:
+        with self._cond:
+            self._stats['failed'] += 1
+        job.future.set_exception(error)
+        self._finish(chat_id)
+
+
+class QueuedBot(Bot):
+    """Bot that sends chat-bound API calls through a ``SendQueue``."""
+
+    __slots__ = ('send_queue',)
+
+    def __init__(self, token: str, send_queue: Optional[SendQueue] = None, **kwargs: Any) -> None:
+        kwargs.setdefault('request', Request(con_pool_size=HTTP_POOL_SIZE))
+        super().__init__(token, **kwargs)
+        self.send_queue = send_queue or SendQueue()
+
+    def _post(self, endpoint: str, data: Dict[str, Any] = None, *args: Any, **kwargs: Any) -> Any:
+        chat_id = data.get('chat_id') if data else None
+        if endpoint in QUEUED_METHODS and chat_id is not None:
+            post = functools.partial(self._timed_post, endpoint, data, *args, **kwargs)
+            return self.send_queue.call(str(chat_id), post)
+        return self._timed_post(endpoint, data, *args, **kwargs)
+
+    def _timed_post(self, *args: Any, **kwargs: Any) -> Any:
+        with stage('send'):
+            return super()._post(*args, **kwargs)
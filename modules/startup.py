@@ -0,0 +1,66 @@
+"""
+Startup timing for the Telegram Synonym/Antonym Bot
+
+Entry points wrap their imports and initialisation steps in
+``startup_step`` and log ``startup_report()`` once they are ready to serve;
+steps that finish later (such as loading WordNet in the background) are
+still exported by the ``/metrics`` route as ``synant_startup_seconds``.
+"""
+import contextlib
+import logging
+import threading
+import time
+from typing import Iterable, Iterator, List, Tuple
+
+from .metrics import REGISTRY, Family
+
+logger = logging.getLogger(__name__)
+
+# (step, seconds, nesting depth, start time) in the order the steps finished
+_steps: List[Tuple[str, float, int, float]] = []
+_lock = threading.Lock()
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def startup_step(name: str) -> Iterator[None]:
+    """Record how long the ``with`` block takes as a startup step; steps may nest."""
+    depth = getattr(_local, 'depth', 0)
+    _local.depth = depth + 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _local.depth = depth
+        with _lock:
+            _steps.append((name, time.perf_counter() - start, depth, start))
+
+
+def startup_steps() -> List[Tuple[str, float]]:
+    """(step, seconds) for every recorded step, in the order they finished."""
+    with _lock:
+        return [(name, seconds) for name, seconds, _, _ in _steps]
+
+
+def startup_report() -> str:
+    """A table of the recorded steps in start order, nested steps indented, and their total."""
+    with _lock:
+        steps = sorted(_steps, key=lambda step: step[3])
+    names = ['  ' * depth + name for name, _, depth, _ in steps]
+    width = max(map(len, names), default=0)
+    lines = [f"  {name:<{width}}  {step[1] * 1000:8.1f} ms" for name, step in zip(names, steps)]
+    total = sum(seconds for _, seconds, depth, _ in steps if depth == 0)
+    lines.append(f"  {'total':<{width}}  {total * 1000:8.1f} ms")
+    return '\n'.join(lines)
+
+
+def log_startup_report() -> None:
+    logger.info("Startup times:\n%s", startup_report())
+
+
+def _collect() -> Iterable[Family]:
+    yield ('synant_startup_seconds', 'gauge', 'Time spent in each startup step',
+           [((('step', name),), seconds) for name, seconds in startup_steps()])
+
+
+REGISTRY.register_collector('startup', _collect)
@@ -0,0 +1,298 @@
+"""
+Precompiled thesaurus index for the Telegram Synonym/Antonym Bot
+
+The index is built offline from WordNet and stores the complete
+``get_word_info`` result for every WordNet lemma in one binary file. At
+runtime the file is memory-mapped, so a lookup is a binary search over the
+offset table followed by decoding a single record; NLTK is not needed.
+
+File layout (all integers are little-endian unsigned 32-bit):
+
+    header   magic, version, string count, entry count,
+             string table offset, entry table offset, record offset
+    strings  (count + 1) cumulative end offsets, then the UTF-8 string data
+    entries  (key string id, record offset, record length), sorted by key
+    records  flat integer arrays, see ``_encode_record``
+
+Build the index with:
+
+    python -m modules.thesaurus_index [output_path]
+"""
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import THESAURUS_INDEX_PATH
+from .startup import startup_step
+from .word_record import POS_TAGS, PosEntry, WordInfo
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'SYNIDX01'
+VERSION = 1
+
+_HEADER = struct.Struct('<8s6I')
+_ENTRY = struct.Struct('<3I')
+_PAIR = struct.Struct('<2I')
+
+
+class _StringTable:
+    """Deduplicating string table used while building the index."""
+
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def add(self, text: str) -> int:
+        sid = self.ids.get(text)
+        if sid is None:
+            sid = len(self.strings)
+            self.ids[text] = sid
+            self.strings.append(text)
+        return sid
+
+
+def _encode_record(info: Optional[Dict[str, Any]], strings: _StringTable) -> List[int]:
+    """
+    Encode a ``get_word_info`` result as a flat list of integers.
+
+    Layout: number of POS groups, then per group the POS tag index, the
+    meanings and examples (count followed by string ids) and the synonyms
+    and antonyms (count followed by word/meaning string id pairs).
+    """
+    if not info:
+        return [0]
+
+    ints = [len(info)]
+    for pos, data in info.items():
+        ints.append(POS_TAGS.index(pos))
+        for key in ('meanings', 'examples'):
+            ints.append(len(data[key]))
+            ints.extend(strings.add(text) for text in data[key])
+        for key in ('synonyms', 'antonyms'):
+            ints.append(len(data[key]))
+            for item in data[key]:
+                ints.append(strings.add(item['word']))
+                ints.append(strings.add(item['meaning']))
+    return ints
+
+
+class ThesaurusIndex:
+    """Read-only, memory-mapped view of a built thesaurus index."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        magic, version, n_strings, n_entries, strings_off, entries_off, records_off = (
+            _HEADER.unpack_from(self._mm, 0)
+        )
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} thesaurus index")
+
+        self._n_entries = n_entries
+        self._strings_off = strings_off
+        self._string_data_off = strings_off + 4 * (n_strings + 1)
+        self._entries_off = entries_off
+        self._records_off = records_off
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self._n_entries
+
+    def __contains__(self, word: str) -> bool:
+        return self._find(word) >= 0
+
+    def __getitem__(self, word: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the stored word info dict, or None if the word has no results.
+
+        Raises:
+            KeyError: if the word is not in the index at all
+        """
+        record = self.get_record(word)
+        return record.to_dict() if record else None
+
+    def get_record(self, word: str) -> Optional[WordInfo]:
+        """
+        Return the stored word record, or None if the word has no results.
+
+        Raises:
+            KeyError: if the word is not in the index at all
+        """
+        i = self._find(word)
+        if i < 0:
+            raise KeyError(word)
+        _, offset, length = _ENTRY.unpack_from(self._mm, self._entries_off + i * _ENTRY.size)
+        ints = struct.unpack_from(f'<{length}I', self._mm, self._records_off + offset)
+        return self._decode_record(word, ints)
+
+    def _string_bytes(self, sid: int) -> bytes:
+        start, end = _PAIR.unpack_from(self._mm, self._strings_off + 4 * sid)
+        return self._mm[self._string_data_off + start:self._string_data_off + end]
+
+    def _string(self, sid: int) -> str:
+        return sys.intern(self._string_bytes(sid).decode('utf-8'))
+
+    def _key(self, i: int) -> bytes:
+        sid = struct.unpack_from('<I', self._mm, self._entries_off + i * _ENTRY.size)[0]
+        return self._string_bytes(sid)
+
+    def keys(self) -> List[str]:
+        """Return all indexed words in index order."""
+        return [self._key(i).decode('utf-8') for i in range(self._n_entries)]
+
+    def _find(self, word: str) -> int:
+        """Binary search the entry table; return the entry index or -1."""
+        target = word.encode('utf-8')
+        lo, hi = 0, self._n_entries
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n_entries and self._key(lo) == target:
+            return lo
+        return -1
+
+    def _decode_record(self, word: str, ints: Tuple[int, ...]) -> Optional[WordInfo]:
+        n_pos = ints[0]
+        if not n_pos:
+            return None
+
+        string = self._string
+        entries = []
+        i = 1
+        for _ in range(n_pos):
+            pos = POS_TAGS[ints[i]]
+            i += 1
+            lists = []
+            for _ in range(2):
+                count = ints[i]
+                lists.append(tuple(string(sid) for sid in ints[i + 1:i + 1 + count]))
+                i += 1 + count
+            for _ in range(2):
+                count = ints[i]
+                pairs = ints[i + 1:i + 1 + 2 * count]
+                lists.append(tuple(
+                    (string(pairs[j]), string(pairs[j + 1])) for j in range(0, 2 * count, 2)
+                ))
+                i += 1 + 2 * count
+            entries.append(PosEntry(pos, *lists))
+        return WordInfo(sys.intern(word), tuple(entries))
+
+
+def build_index(path: str = THESAURUS_INDEX_PATH) -> int:
+    """
+    Compile the thesaurus index for every WordNet lemma.
+
+    Args:
+        path: Output file path
+
+    Returns:
+        Number of indexed words
+    """
+    from .wordnet_utils import build_word_info, get_wordnet
+
+    wordnet = get_wordnet()
+    # The live lookup logs every synset; keep the build output readable
+    logging.getLogger('modules.wordnet_utils').setLevel(logging.WARNING)
+
+    words = sorted(set(wordnet.all_lemma_names()), key=lambda w: w.encode('utf-8'))
+    logger.info("Building thesaurus index for %d lemmas", len(words))
+
+    strings = _StringTable()
+    entries = []
+    records = []
+    record_offset = 0
+    start_time = time.time()
+
+    for n, word in enumerate(words, 1):
+        try:
+            info = build_word_info(word)
+        except Exception as e:
+            logger.error("Error processing word %s: %s", word, e)
+            info = None
+        ints = _encode_record(info, strings)
+        entries.append((strings.add(word), record_offset, len(ints)))
+        records.append(struct.pack(f'<{len(ints)}I', *ints))
+        record_offset += 4 * len(ints)
+        if n % 10000 == 0:
+            logger.info("Indexed %d/%d lemmas (%.0fs)", n, len(words), time.time() - start_time)
+
+    encoded = [s.encode('utf-8') for s in strings.strings]
+    string_offsets = [0]
+    for data in encoded:
+        string_offsets.append(string_offsets[-1] + len(data))
+
+    strings_off = _HEADER.size
+    entries_off = strings_off + 4 * len(string_offsets) + string_offsets[-1]
+    records_off = entries_off + _ENTRY.size * len(entries)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(encoded), len(entries),
+                             strings_off, entries_off, records_off))
+        f.write(struct.pack(f'<{len(string_offsets)}I', *string_offsets))
+        f.write(b''.join(encoded))
+        for entry in entries:
+            f.write(_ENTRY.pack(*entry))
+        f.write(b''.join(records))
+    os.replace(tmp_path, path)
+
+    logger.info("Thesaurus index written to %s (%d bytes, %.0fs)",
+                path, os.path.getsize(path), time.time() - start_time)
+    return len(entries)
+
+
+_index: Optional[ThesaurusIndex] = None
+_index_checked = False
+_index_lock = threading.Lock()
+
+
+def get_thesaurus_index() -> Optional[ThesaurusIndex]:
+    """Open the thesaurus index on first use; return None if it is not built."""
+    global _index, _index_checked
+    if not _index_checked:
+        with _index_lock:
+            if not _index_checked:
+                if os.path.exists(THESAURUS_INDEX_PATH):
+                    try:
+                        with startup_step('thesaurus index'):
+                            _index = ThesaurusIndex(THESAURUS_INDEX_PATH)
+                        logger.info("Thesaurus index loaded (%d words)", len(_index))
+                    except (OSError, ValueError) as e:
+                        logger.error("Error loading thesaurus index: %s", e)
+                else:
+                    logger.info("Thesaurus index not found, using live WordNet lookups")
+                _index_checked = True
+    return _index
+
+
+if __name__ == '__main__':
+    import argparse
+
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+    parser = argparse.ArgumentParser(description="Build the precompiled thesaurus index")
+    parser.add_argument('path', nargs='?', default=THESAURUS_INDEX_PATH)
+    args = parser.parse_args()
+    build_index(args.path)
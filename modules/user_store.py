@@ -0,0 +1,430 @@
+"""
+User data storage backends for the Telegram Synonym/Antonym Bot
+
+Two interchangeable backends keep per-user settings and lookup history:
+
+* ``JSONUserStore`` - the whole ``data/user_data.json`` file, rewritten on
+  every change. Simple and fine for small installs.
+* ``SQLiteUserStore`` - a SQLite database in WAL mode with one row per user
+  and per history entry, so writes touch only the affected rows and
+  concurrent workers do not overwrite each other's updates.
+
+The backend is selected with the ``USER_STORE`` environment variable
+(``json`` or ``sqlite``). Existing JSON data can be imported with:
+
+    python -m modules.user_store migrate [--json PATH] [--db PATH]
+"""
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    USER_DATA_PATH, USER_DB_PATH, USER_STORE_BACKEND,
+    PREFERENCE_CACHE_MAX_ENTRIES, PREFERENCE_CACHE_CHECK_INTERVAL
+)
+from .cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Number of most recent lookups kept per user
+HISTORY_LIMIT = 10
+
+
+class UserStore(ABC):
+    """Interface shared by the user data backends."""
+
+    # Files whose modification time and size identify the stored data version
+    _version_paths: Tuple[str, ...] = ()
+    # Data versions just before and just after this store's last own write
+    _own_write: Tuple[Optional[Tuple], Optional[Tuple]] = (None, None)
+
+    def data_version(self) -> Tuple:
+        """Cheap fingerprint of the stored data; changes whenever any process writes."""
+        version = []
+        for path in self._version_paths:
+            try:
+                stat = os.stat(path)
+                version.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                version.append(None)
+        return tuple(version)
+
+    def last_write(self) -> Tuple[Optional[Tuple], Optional[Tuple]]:
+        """The data versions just before and just after this store's last own write."""
+        return self._own_write
+
+    def _mark_written(self, before: Tuple) -> None:
+        self._own_write = (before, self.data_version())
+
+    @abstractmethod
+    def get_preferences(self, user_id: int) -> Dict[str, Any]:
+        """Get the user's settings (everything except the history)."""
+
+    @abstractmethod
+    def get_language(self, user_id: int) -> Optional[str]:
+        """Get the user's interface language, or None if it was never set."""
+
+    @abstractmethod
+    def set_language(self, user_id: int, language: str) -> None:
+        """Set the user's interface language."""
+
+    @abstractmethod
+    def get_history(self, user_id: int) -> List[Dict[str, Any]]:
+        """
+        Get the user's lookup history, oldest first.
+
+        Entries only hold the 'word'; its details are looked up when needed.
+        """
+
+    @abstractmethod
+    def add_history(self, user_id: int, word: str, language: str,
+                    limit: int = HISTORY_LIMIT) -> bool:
+        """
+        Append a lookup to the user's history unless the word is already there.
+
+        Args:
+            user_id: Telegram user id
+            word: Looked up word
+            language: Language to record if the user is new
+            limit: Number of most recent entries to keep
+
+        Returns:
+            True if the entry was added
+        """
+
+    @abstractmethod
+    def history_counts(self) -> Counter:
+        """
+        Count how many users have each word in their history.
+
+        Returns:
+            Counter keyed by (word, user's language); the language is None
+            if the user never set one
+        """
+
+    def add_history_many(self, entries: List[Dict[str, Any]],
+                         limit: int = HISTORY_LIMIT) -> int:
+        """
+        Apply a batch of history entries in order, as ``add_history`` would.
+
+        Args:
+            entries: Dicts with 'user_id', 'word' and 'language' keys
+            limit: Number of most recent entries to keep per user
+
+        Returns:
+            Number of entries added
+        """
+        return sum(
+            self.add_history(e['user_id'], e['word'], e['language'], limit)
+            for e in entries
+        )
+
+
+class JSONUserStore(UserStore):
+    """User data kept in a single JSON document."""
+
+    def __init__(self, path: str = USER_DATA_PATH) -> None:
+        self.path = path
+        self._version_paths = (path,)
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save(self, data: Dict[str, Any]) -> None:
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        before = self.data_version()
+        with open(self.path, 'w') as f:
+            json.dump(data, f, indent=2)
+        self._mark_written(before)
+
+    def get_preferences(self, user_id: int) -> Dict[str, Any]:
+        user = self.load().get(str(user_id), {})
+        return {key: value for key, value in user.items() if key != 'history'}
+
+    def get_language(self, user_id: int) -> Optional[str]:
+        return self.load().get(str(user_id), {}).get('language')
+
+    def set_language(self, user_id: int, language: str) -> None:
+        with self._lock:
+            data = self.load()
+            data.setdefault(str(user_id), {})['language'] = language
+            self.save(data)
+
+    def get_history(self, user_id: int) -> List[Dict[str, Any]]:
+        history = self.load().get(str(user_id), {}).get('history', [])
+        return [{'word': item['word']} for item in history]
+
+    def history_counts(self) -> Counter:
+        return Counter(
+            (item['word'], user.get('language'))
+            for user in self.load().values()
+            for item in user.get('history', [])
+        )
+
+    def add_history(self, user_id: int, word: str, language: str,
+                    limit: int = HISTORY_LIMIT) -> bool:
+        with self._lock:
+            data = self.load()
+            if not self._append_history(data, user_id, word, language, limit):
+                return False
+            self.save(data)
+            return True
+
+    def add_history_many(self, entries: List[Dict[str, Any]],
+                         limit: int = HISTORY_LIMIT) -> int:
+        with self._lock:
+            data = self.load()
+            added = sum(
+                self._append_history(data, e['user_id'], e['word'], e['language'], limit)
+                for e in entries
+            )
+            if added:
+                self.save(data)
+            return added
+
+    @staticmethod
+    def _append_history(data: Dict[str, Any], user_id: int, word: str,
+                        language: str, limit: int) -> bool:
+        user = data.setdefault(str(user_id), {'history': [], 'language': language})
+        history = user.setdefault('history', [])
+        if word in [item['word'] for item in history]:
+            return False
+        history.append({'word': word})
+        # Older files stored the full word info with every entry; drop it
+        user['history'] = [{'word': item['word']} for item in history[-limit:]]
+        return True
+
+
+class SQLiteUserStore(UserStore):
+    """User data kept in a SQLite database in WAL mode."""
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS users ("
+        " user_id TEXT PRIMARY KEY,"
+        " language TEXT)",
+        "CREATE TABLE IF NOT EXISTS history ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " user_id TEXT NOT NULL,"
+        " word TEXT NOT NULL,"
+        " UNIQUE (user_id, word))",
+    )
+
+    # Statements are kept as constants so sqlite3's statement cache reuses
+    # the prepared versions
+    _GET_LANGUAGE = "SELECT language FROM users WHERE user_id = ?"
+    _SET_LANGUAGE = (
+        "INSERT INTO users (user_id, language) VALUES (?, ?) "
+        "ON CONFLICT (user_id) DO UPDATE SET language = excluded.language"
+    )
+    _ADD_USER = "INSERT OR IGNORE INTO users (user_id, language) VALUES (?, ?)"
+    _GET_HISTORY = "SELECT word FROM history WHERE user_id = ? ORDER BY id"
+    _ADD_HISTORY = "INSERT OR IGNORE INTO history (user_id, word) VALUES (?, ?)"
+    _HISTORY_COUNTS = (
+        "SELECT history.word, users.language, COUNT(*) FROM history "
+        "LEFT JOIN users ON users.user_id = history.user_id "
+        "GROUP BY history.word, users.language"
+    )
+    _TRIM_HISTORY = (
+        "DELETE FROM history WHERE user_id = ? AND id NOT IN "
+        "(SELECT id FROM history WHERE user_id = ? ORDER BY id DESC LIMIT ?)"
+    )
+
+    def __init__(self, path: str = USER_DB_PATH) -> None:
+        self.path = path
+        self._version_paths = (path, path + '-wal')
+        self._local = threading.local()
+        with self._connect() as conn:
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextlib.contextmanager
+    def _write(self):
+        """Run statements in one transaction that holds the database write lock."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        # No other process can commit until we do, so this is exactly the
+        # version our own write starts from
+        before = self.data_version()
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        self._mark_written(before)
+
+    def get_preferences(self, user_id: int) -> Dict[str, Any]:
+        language = self.get_language(user_id)
+        return {'language': language} if language is not None else {}
+
+    def get_language(self, user_id: int) -> Optional[str]:
+        row = self._connect().execute(self._GET_LANGUAGE, (str(user_id),)).fetchone()
+        return row[0] if row else None
+
+    def set_language(self, user_id: int, language: str) -> None:
+        with self._write() as conn:
+            conn.execute(self._SET_LANGUAGE, (str(user_id), language))
+
+    def get_history(self, user_id: int) -> List[Dict[str, Any]]:
+        rows = self._connect().execute(self._GET_HISTORY, (str(user_id),)).fetchall()
+        return [{'word': word} for word, in rows]
+
+    def history_counts(self) -> Counter:
+        rows = self._connect().execute(self._HISTORY_COUNTS).fetchall()
+        return Counter({(word, language): count for word, language, count in rows})
+
+    def add_history(self, user_id: int, word: str, language: str,
+                    limit: int = HISTORY_LIMIT) -> bool:
+        with self._write() as conn:
+            return self._insert_history(conn, user_id, word, language, limit)
+
+    def add_history_many(self, entries: List[Dict[str, Any]],
+                         limit: int = HISTORY_LIMIT) -> int:
+        with self._write() as conn:
+            return sum(
+                self._insert_history(conn, e['user_id'], e['word'], e['language'], limit)
+                for e in entries
+            )
+
+    def _insert_history(self, conn: sqlite3.Connection, user_id: int, word: str,
+                        language: str, limit: int) -> bool:
+        user_id = str(user_id)
+        conn.execute(self._ADD_USER, (user_id, language))
+        cursor = conn.execute(self._ADD_HISTORY, (user_id, word))
+        if not cursor.rowcount:
+            return False
+        conn.execute(self._TRIM_HISTORY, (user_id, user_id, limit))
+        return True
+
+    def import_json(self, data: Dict[str, Any]) -> int:
+        """
+        Import users from the JSON backend's document.
+
+        Returns:
+            Number of imported users
+        """
+        with self._write() as conn:
+            for user_id, user in data.items():
+                if user.get('language'):
+                    conn.execute(self._SET_LANGUAGE, (user_id, user['language']))
+                else:
+                    conn.execute(self._ADD_USER, (user_id, None))
+                for item in user.get('history', []):
+                    conn.execute(self._ADD_HISTORY, (user_id, item['word']))
+        return len(data)
+
+
+class PreferenceCache:
+    """
+    Read-through, write-through cache of per-user settings.
+
+    Reads are served from a bounded in-process cache. At most once per
+    check interval the store's data version is compared with the last one
+    seen. If the only change since then is this process's own last write
+    the cache stays valid; any other change (e.g. by another worker
+    process) clears it.
+    """
+
+    def __init__(self, store: UserStore,
+                 max_entries: int = PREFERENCE_CACHE_MAX_ENTRIES,
+                 check_interval: float = PREFERENCE_CACHE_CHECK_INTERVAL) -> None:
+        self.store = store
+        self.check_interval = check_interval
+        self._prefs = LRUCache(max_entries)
+        self._version = store.data_version()
+        self._next_check = time.monotonic() + check_interval
+
+    def _check_version(self) -> None:
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        version = self.store.data_version()
+        if version != self._version:
+            if self.store.last_write() != (self._version, version):
+                self._prefs.clear()
+            self._version = version
+
+    def get(self, user_id: int) -> Dict[str, Any]:
+        """Get the user's settings."""
+        self._check_version()
+        prefs = self._prefs.get(user_id)
+        if prefs is None:
+            prefs = self.store.get_preferences(user_id)
+            self._prefs.set(user_id, prefs)
+        return prefs
+
+    def set_language(self, user_id: int, language: str) -> None:
+        """Store the user's language and update the cached settings."""
+        self.store.set_language(user_id, language)
+        prefs = dict(self._prefs.get(user_id) or self.store.get_preferences(user_id))
+        prefs['language'] = language
+        self._prefs.set(user_id, prefs)
+
+
+_store: Optional[UserStore] = None
+_preferences: Optional[PreferenceCache] = None
+_store_lock = threading.Lock()
+
+
+def get_user_store() -> UserStore:
+    """Get the configured user data backend."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if USER_STORE_BACKEND == 'sqlite':
+                    _store = SQLiteUserStore()
+                else:
+                    _store = JSONUserStore()
+                logger.info("Using %s for user data", type(_store).__name__)
+    return _store
+
+
+def get_preference_cache() -> PreferenceCache:
+    """Get the process-wide user settings cache."""
+    global _preferences
+    if _preferences is None:
+        store = get_user_store()
+        with _store_lock:
+            if _preferences is None:
+                _preferences = PreferenceCache(store)
+    return _preferences
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="User data store maintenance")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate = subparsers.add_parser('migrate', help="import the JSON user data into SQLite")
+    migrate.add_argument('--json', default=USER_DATA_PATH, help="JSON user data file")
+    migrate.add_argument('--db', default=USER_DB_PATH, help="SQLite database file")
+    args = parser.parse_args()
+
+    if args.command == 'migrate':
+        count = SQLiteUserStore(args.db).import_json(JSONUserStore(args.json).load())
+        print(f"Imported {count} users from {args.json} into {args.db}")
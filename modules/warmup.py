@@ -0,0 +1,118 @@
+"""
+Cache warm-up for the Telegram Synonym/Antonym Bot
+
+The lookup and response caches are empty after every restart. The words
+users are likely to ask for again are known from their lookup histories
+and from the "Looking up word" lines in the log file, so at startup a
+background thread ranks the words from both sources by frequency and
+looks up and renders the most popular ones before users ask for them.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from config import (
+    DEFAULT_LANGUAGE, LOG_FILE, WARMUP_WORDS, WARMUP_LOG_MAX_BYTES, WARMUP_PAUSE,
+    WORD_CACHE_MAX_ENTRIES
+)
+from .rendering import render_word_response
+from .metrics import uninstrumented
+from .morphology import canonical_form
+from .startup import startup_step
+from .user_store import get_user_store
+from .wordnet_utils import get_word_record, word_cache
+
+logger = logging.getLogger(__name__)
+
+MODES = ('synonym', 'antonym', 'both')
+
+_LOOKUP_LINE = re.compile(rb' - INFO - Looking up word: (\S+)$', re.MULTILINE)
+
+
+def log_word_counts(path: Optional[str] = LOG_FILE, max_bytes: int = WARMUP_LOG_MAX_BYTES) -> Counter:
+    """Count the words in "Looking up word" lines of the last ``max_bytes`` of the log."""
+    counts: Counter = Counter()
+    if not path or not os.path.exists(path):
+        return counts
+    try:
+        with open(path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - max_bytes))
+            data = f.read()
+    except OSError as e:
+        logger.error("Error reading %s for cache warm-up: %s", path, e)
+        return counts
+    for match in _LOOKUP_LINE.finditer(data):
+        counts[match.group(1).decode('utf-8', 'replace').lower()] += 1
+    return counts
+
+
+def popular_words(limit: int = WARMUP_WORDS) -> List[Tuple[str, List[str]]]:
+    """
+    The most looked up words, most popular first.
+
+    Returns:
+        Up to ``limit`` (word, interface languages to render it in) pairs
+    """
+    word_counts: Counter = Counter()
+    languages: Dict[str, Counter] = {}
+    try:
+        for (word, language), count in get_user_store().history_counts().items():
+            word = word.lower()
+            word_counts[word] += count
+            languages.setdefault(word, Counter())[language or DEFAULT_LANGUAGE] += count
+    except Exception as e:
+        logger.error("Error reading lookup history for cache warm-up: %s", e)
+    word_counts.update(log_word_counts())
+
+    return [
+        (word, [language for language, _ in languages[word].most_common()]
+         if word in languages else [DEFAULT_LANGUAGE])
+        for word, _ in word_counts.most_common(limit)
+    ]
+
+
+def warm_up(limit: int = WARMUP_WORDS, pause: float = WARMUP_PAUSE) -> int:
+    """
+    Look up and render the most popular words.
+
+    Args:
+        limit: Number of words to warm
+        pause: Seconds to sleep between words, so request threads get the
+            interpreter while the warm-up runs
+
+    Returns:
+        Number of words found and cached
+    """
+    start = time.perf_counter()
+    warmed = 0
+    # Boot-time lookups would skew the request latency and WordNet call metrics
+    with startup_step('cache warm-up'), uninstrumented():
+        # Warming more words than the cache holds would only evict the most popular ones
+        for word, languages in popular_words(min(limit, WORD_CACHE_MAX_ENTRIES)):
+            # Older history and log entries may hold inflected forms
+            word = canonical_form(word)
+            if word_cache.version(word) is None:
+                if get_word_record(word) is None:
+                    continue
+            for language in languages:
+                for mode in MODES:
+                    render_word_response(word, mode, language)
+            warmed += 1
+            if pause:
+                time.sleep(pause)
+    logger.info("Cache warm-up: %d words in %.1fs", warmed, time.perf_counter() - start)
+    return warmed
+
+
+def start_warmup(limit: int = WARMUP_WORDS) -> Optional[threading.Thread]:
+    """Run ``warm_up`` in a background thread; returns None if it is disabled."""
+    if limit <= 0:
+        return None
+    thread = threading.Thread(target=warm_up, args=(limit,), name='cache-warmup', daemon=True)
+    thread.start()
+    return thread
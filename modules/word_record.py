@@ -0,0 +1,131 @@
+"""
+Compact word information records for the Telegram Synonym/Antonym Bot
+
+``get_word_info`` historically returned nested dicts of lists of dicts.
+``WordInfo`` holds the same data in slotted objects and tuples with
+interned strings, so repeated definitions are stored once. ``to_dict``
+rebuilds the original dict view for existing callers.
+"""
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Parts of speech in the order used by the thesaurus index encoding
+POS_TAGS = 'nvasr'
+POS_NAMES = {
+    'n': 'Noun',
+    'v': 'Verb',
+    'a': 'Adjective',
+    'r': 'Adverb',
+    's': 'Adjective Satellite'
+}
+
+# (word, meaning) pairs for synonyms and antonyms
+WordPair = Tuple[str, str]
+
+
+class PosEntry:
+    """Word information for a single part of speech."""
+
+    __slots__ = ('pos', 'meanings', 'examples', 'synonyms', 'antonyms')
+
+    def __init__(
+            self,
+            pos: str,
+            meanings: Tuple[str, ...],
+            examples: Tuple[str, ...],
+            synonyms: Tuple[WordPair, ...],
+            antonyms: Tuple[WordPair, ...]
+    ) -> None:
+        self.pos = pos
+        self.meanings = meanings
+        self.examples = examples
+        self.synonyms = synonyms
+        self.antonyms = antonyms
+
+    @property
+    def pos_name(self) -> str:
+        return POS_NAMES.get(self.pos, 'Other')
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, PosEntry) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'pos_name': self.pos_name,
+            'meanings': list(self.meanings),
+            'synonyms': [{'word': w, 'meaning': m, 'examples': []} for w, m in self.synonyms],
+            'antonyms': [{'word': w, 'meaning': m, 'examples': []} for w, m in self.antonyms],
+            'examples': list(self.examples)
+        }
+
+    def memory_size(self) -> int:
+        size = sys.getsizeof(self) + sum(
+            sys.getsizeof(seq) for seq in (self.meanings, self.examples, self.synonyms, self.antonyms)
+        )
+        for text in self.meanings + self.examples:
+            size += sys.getsizeof(text)
+        for pair in self.synonyms + self.antonyms:
+            size += sys.getsizeof(pair) + sys.getsizeof(pair[0]) + sys.getsizeof(pair[1])
+        return size
+
+
+class WordInfo:
+    """Synonyms, antonyms, meanings and examples of a word, grouped by part of speech."""
+
+    __slots__ = ('word', 'entries')
+
+    def __init__(self, word: str, entries: Tuple[PosEntry, ...]) -> None:
+        self.word = word
+        self.entries = entries
+
+    def __iter__(self) -> Iterator[PosEntry]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, WordInfo) and self.word == other.word and self.entries == other.entries
+
+    def __repr__(self) -> str:
+        return f"WordInfo({self.word!r}, {''.join(e.pos for e in self.entries)!r})"
+
+    def synonym_words(self) -> List[str]:
+        """All synonyms across parts of speech, without duplicates."""
+        return list(dict.fromkeys(w for entry in self.entries for w, _ in entry.synonyms))
+
+    def antonym_words(self) -> List[str]:
+        """All antonyms across parts of speech, without duplicates."""
+        return list(dict.fromkeys(w for entry in self.entries for w, _ in entry.antonyms))
+
+    def memory_size(self) -> int:
+        """Approximate memory footprint, counting shared strings once per use."""
+        return (sys.getsizeof(self) + sys.getsizeof(self.entries)
+                + sum(entry.memory_size() for entry in self.entries))
+
+    @classmethod
+    def from_dict(cls, word: str, info: Dict[str, Any]) -> 'WordInfo':
+        """Build a record from the ``get_word_info`` dict view."""
+        intern = sys.intern
+        entries = []
+        for pos, data in info.items():
+            entries.append(PosEntry(
+                pos,
+                tuple(intern(text) for text in data['meanings']),
+                tuple(intern(text) for text in data['examples']),
+                tuple((intern(s['word']), intern(s['meaning'])) for s in data['synonyms']),
+                tuple((intern(a['word']), intern(a['meaning'])) for a in data['antonyms'])
+            ))
+        return cls(intern(word), tuple(entries))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Rebuild the ``get_word_info`` dict view."""
+        return {entry.pos: entry.to_dict() for entry in self.entries}
+
+
+def to_record(word: str, info: Optional[Dict[str, Any]]) -> Optional['WordInfo']:
+    """Convert a ``get_word_info`` dict to a record, keeping None as None."""
+    return WordInfo.from_dict(word, info) if info else None
+
@@ -0,0 +1,257 @@
+"""
+Prebuilt WordNet lemma index for the Telegram Synonym/Antonym Bot
+
+NLTK's WordNet reader parses the ``index.*`` text files into a dict of
+lemma -> part of speech -> synset offsets every time a process loads it,
+which takes over a second and is paid again on each worker restart. The
+snapshot stores the same index as flat arrays, built once at deploy time;
+``SnapshotWordNetCorpusReader`` reads it instead of the text files and
+decodes a lemma's entries only when it is looked up.
+
+File layout (all integers are little-endian unsigned 32-bit):
+
+    header        magic, version, lemma count, entry count, offset count,
+                  lemma data length, metadata length
+    metadata      JSON: source file sizes and the exception lists
+    lemmas        UTF-8 lemma names separated by newlines, in NLTK's order
+    lemma starts  (lemma count + 1) indexes into the entry arrays
+    entry pos     one ASCII part-of-speech tag per entry
+    entry starts  (entry count + 1) indexes into the offsets array
+    offsets       synset offsets
+
+The snapshot records the sizes of the WordNet files it was built from and
+is ignored if they change. Build it with:
+
+    python -m modules.wordnet_snapshot [output_path]
+"""
+import json
+import logging
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import WORDNET_SNAPSHOT_PATH
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'SYNWN001'
+VERSION = 1
+
+_HEADER = struct.Struct('<8s6I')
+# Files whose contents the snapshot replaces
+_SOURCE_FILES = ('index.adj', 'index.adv', 'index.noun', 'index.verb',
+                 'adj.exc', 'adv.exc', 'noun.exc', 'verb.exc')
+
+
+def _uint32_array(data: bytes) -> array:
+    values = array('I')
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _fingerprint(root: Any) -> Dict[str, int]:
+    """Sizes of the WordNet files the lemma index and exceptions are read from."""
+    return {name: root.join(name).file_size() for name in _SOURCE_FILES}
+
+
+class SnapshotLemmaMap(Mapping):
+    """
+    Read-only stand-in for NLTK's ``_lemma_pos_offset_map``.
+
+    ``map[lemma]`` returns ``{pos: [offsets]}`` decoded from the arrays, with
+    the adjective offsets repeated under the satellite tag as NLTK does.
+    Unknown lemmas give an empty dict, like the ``defaultdict`` NLTK uses.
+    """
+
+    def __init__(self, lemmas: List[str], lemma_starts: array, entry_pos: bytes,
+                 entry_starts: array, offsets: array) -> None:
+        self._lemmas = lemmas
+        self._rows = dict(zip(lemmas, range(len(lemmas))))
+        self._lemma_starts = lemma_starts
+        self._entry_pos = entry_pos.decode('ascii')
+        self._entry_starts = entry_starts
+        self._offsets = offsets
+
+    def __getitem__(self, lemma: str) -> Dict[str, List[int]]:
+        row = self._rows.get(lemma)
+        if row is None:
+            return {}
+        entries = {}
+        starts = self._entry_starts
+        for i in range(self._lemma_starts[row], self._lemma_starts[row + 1]):
+            pos = self._entry_pos[i]
+            offsets = self._offsets[starts[i]:starts[i + 1]].tolist()
+            entries[pos] = offsets
+            if pos == 'a':
+                entries['s'] = offsets
+        return entries
+
+    def get(self, lemma: str, default: Any = None) -> Any:
+        return self[lemma] if lemma in self._rows else default
+
+    def __contains__(self, lemma: object) -> bool:
+        return lemma in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._lemmas)
+
+    def __len__(self) -> int:
+        return len(self._lemmas)
+
+
+class WordNetSnapshot:
+    """Lemma index and exception lists loaded from a snapshot file."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise ValueError(f"{path} is not a WordNet snapshot")
+        magic, version, n_lemmas, n_entries, n_offsets, lemma_len, meta_len = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} WordNet snapshot")
+
+        view = memoryview(data)
+        pos = _HEADER.size
+        meta = json.loads(bytes(view[pos:pos + meta_len]))
+        pos += meta_len
+        lemmas = bytes(view[pos:pos + lemma_len]).decode('utf-8').split('\n') if n_lemmas else []
+        pos += lemma_len
+        lemma_starts = _uint32_array(view[pos:pos + 4 * (n_lemmas + 1)])
+        pos += 4 * (n_lemmas + 1)
+        entry_pos = bytes(view[pos:pos + n_entries])
+        pos += n_entries
+        entry_starts = _uint32_array(view[pos:pos + 4 * (n_entries + 1)])
+        pos += 4 * (n_entries + 1)
+        offsets = _uint32_array(view[pos:pos + 4 * n_offsets])
+        if len(offsets) != n_offsets or len(lemmas) != n_lemmas:
+            raise ValueError(f"{path} is truncated")
+
+        self.fingerprint: Dict[str, int] = meta['fingerprint']
+        self.exception_map: Dict[str, Dict[str, List[str]]] = meta['exceptions']
+        # The satellite tag shares the adjective exceptions, as in NLTK
+        self.exception_map['s'] = self.exception_map['a']
+        self.lemma_map = SnapshotLemmaMap(lemmas, lemma_starts, entry_pos, entry_starts, offsets)
+
+
+def _reader_class():
+    from nltk.corpus.reader.wordnet import WordNetCorpusReader
+
+    class SnapshotWordNetCorpusReader(WordNetCorpusReader):
+        """WordNet reader that takes its lemma index and exceptions from a snapshot."""
+
+        def __init__(self, root: Any, omw_reader: Any, snapshot: WordNetSnapshot) -> None:
+            self._snapshot = snapshot
+            super().__init__(root, omw_reader)
+
+        def _load_lemma_pos_offset_map(self) -> None:
+            self._lemma_pos_offset_map = self._snapshot.lemma_map
+
+        def _load_exception_map(self) -> None:
+            self._exception_map = self._snapshot.exception_map
+
+    return SnapshotWordNetCorpusReader
+
+
+def load_wordnet(path: str = WORDNET_SNAPSHOT_PATH) -> Optional[Any]:
+    """
+    Create a WordNet reader backed by the snapshot.
+
+    Returns None if there is no usable snapshot for the installed WordNet
+    data, in which case the caller should load WordNet the usual way.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        import nltk.data
+        from nltk.corpus.reader import CorpusReader
+        from nltk.corpus.util import LazyCorpusLoader
+
+        root = nltk.data.find('corpora/wordnet')
+        snapshot = WordNetSnapshot(path)
+        if snapshot.fingerprint != _fingerprint(root):
+            logger.warning("WordNet snapshot %s doesn't match the installed WordNet data; "
+                           "rebuild it with: python -m modules.wordnet_snapshot", path)
+            return None
+        # The same multilingual data nltk.corpus.wordnet is created with
+        omw = LazyCorpusLoader('omw-1.4', CorpusReader, r'.*/wn-data-.*\.tab', encoding='utf8')
+        return _reader_class()(root, omw, snapshot)
+    except (LookupError, OSError, ValueError, KeyError) as e:
+        logger.error("Error loading WordNet snapshot: %s", e)
+        return None
+
+
+def build_snapshot(path: str = WORDNET_SNAPSHOT_PATH) -> int:
+    """
+    Write a snapshot of the installed WordNet lemma index.
+
+    Args:
+        path: Output file path
+
+    Returns:
+        Number of lemmas in the snapshot
+    """
+    import nltk.data
+    from nltk.corpus import wordnet
+
+    wordnet.ensure_loaded()
+    root = nltk.data.find('corpora/wordnet')
+
+    lemmas = []
+    lemma_starts = array('I', [0])
+    entry_pos = bytearray()
+    entry_starts = array('I', [0])
+    offsets = array('I')
+    for lemma, entries in wordnet._lemma_pos_offset_map.items():
+        lemmas.append(lemma)
+        for pos, synset_offsets in entries.items():
+            if pos == 's':
+                continue  # Repeats the adjective entry
+            entry_pos += pos.encode('ascii')
+            offsets.extend(synset_offsets)
+            entry_starts.append(len(offsets))
+        lemma_starts.append(len(entry_pos))
+
+    exceptions = {pos: table for pos, table in wordnet._exception_map.items() if pos != 's'}
+    meta = json.dumps({'fingerprint': _fingerprint(root), 'exceptions': exceptions},
+                      separators=(',', ':')).encode('utf-8')
+    lemma_data = '\n'.join(lemmas).encode('utf-8')
+
+    arrays = [lemma_starts, entry_starts, offsets]
+    if sys.byteorder == 'big':
+        for values in arrays:
+            values.byteswap()
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(lemmas), len(entry_pos), len(offsets),
+                             len(lemma_data), len(meta)))
+        f.write(meta)
+        f.write(lemma_data)
+        f.write(lemma_starts.tobytes())
+        f.write(bytes(entry_pos))
+        f.write(entry_starts.tobytes())
+        f.write(offsets.tobytes())
+    os.replace(tmp_path, path)
+
+    logger.info("WordNet snapshot written to %s (%d lemmas, %d bytes)", path, len(lemmas), os.path.getsize(path))
+    return len(lemmas)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+    parser = argparse.ArgumentParser(description="Build the WordNet lemma index snapshot")
+    parser.add_argument('path', nargs='?', default=WORDNET_SNAPSHOT_PATH)
+    args = parser.parse_args()
+    build_snapshot(args.path)
@@ -6,13 +6,15 @@ import time
 from typing import Callable, Any
 from functools import wraps
 from config import RESPONSE_TIMEOUT
+from modules.metrics import HANDLER_SECONDS
 
 logger = logging.getLogger(__name__)
 
 
 def timed_function(func: Callable) -> Callable:
     """
-    Decorator to time function execution and log if it exceeds timeout.
+    Decorator to time function execution, record it in the handler latency
+    histogram and log if it exceeds timeout.
 
     Args:
         func: Function to time
@@ -23,17 +25,18 @@ def timed_function(func: Callable) -> Callable:
 
     @wraps(func)
     def wrapper(*args, **kwargs) -> Any:
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        execution_time = time.time() - start_time
-
-        if execution_time > RESPONSE_TIMEOUT:
-            logger.warning(
-                f"Function {func.__name__} took {execution_time:.2f}s to execute, "
-                f"exceeding the {RESPONSE_TIMEOUT}s timeout"
-            )
-
-        return result
+        start_time = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            execution_time = time.perf_counter() - start_time
+            HANDLER_SECONDS.observe(execution_time, handler=func.__name__)
+
+            if execution_time > RESPONSE_TIMEOUT:
+                logger.warning(
+                    "Function %s took %.2fs to execute, exceeding the %ss timeout",
+                    func.__name__, execution_time, RESPONSE_TIMEOUT
+                )
 
     return wrapper
 